@@ -1,24 +1,47 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPAuthorizationCredentials
 
-from app.models.auth import UserCredentials, TokenResponse, TokenData
+from app.models.auth import UserCredentials, TokenResponse, TokenData, UserInfoResponse
 from app.models.common import ErrorResponse
 from app.models.checklist import ChecklistGenerationRequest, ChecklistGenerationResponse
+from app.models.trip import TripDataResponse
 from app.services.auth import auth_service
-from app.services import groq_client, create_checklist_generator
+from app.services import checklist_batcher, ChecklistBatcher
 from app.services.checklist_generator import ChecklistGenerationError
 from app.services.groq_client import GroqAPIError, GroqRateLimitError
 from app.core.auth import get_current_active_user, security
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Static response bodies, serialized once
+_HEALTH_BODY = orjson.dumps({"status": "API is healthy", "version": "1.0.0"})
+_LOGOUT_BODY = orjson.dumps({"message": "Logout successful. Please discard your token on the client side."})
+
+# Fixed error details for the checklist endpoint
+_RATE_LIMIT_DETAIL = "Service temporarily unavailable due to rate limiting. Please try again later."
+_AI_UNAVAILABLE_DETAIL = "AI service temporarily unavailable. Please try again later."
+_UNEXPECTED_DETAIL = "An unexpected error occurred. Please try again later."
+
+
+def _checklist_error(status_code: int, detail: str) -> HTTPException:
+    """Build a fresh HTTPException per raise, so no traceback or context is shared between requests."""
+    return HTTPException(status_code=status_code, detail=detail)
+
+
+def get_checklist_batcher() -> ChecklistBatcher:
+    """Dependency returning the shared checklist generation batcher."""
+    return checklist_batcher
 
 
 @router.get("/health")
 async def api_health():
-    return {"status": "API is healthy", "version": "1.0.0"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 # Authentication endpoints
@@ -38,7 +61,8 @@ async def login(credentials: UserCredentials):
     - Username: testuser, Password: testpass123
     - Username: demo, Password: demopass123
     """
-    user = auth_service.authenticate_user(credentials)
+    # bcrypt is deliberately slow; keep it off the event loop
+    user = await run_in_threadpool(auth_service.authenticate_user, credentials)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -52,7 +76,7 @@ async def login(credentials: UserCredentials):
 
 @router.get(
     "/auth/me",
-    response_model=dict,
+    response_model=UserInfoResponse,
     responses={
         401: {"model": ErrorResponse, "description": "Invalid or missing token"}
     }
@@ -64,12 +88,11 @@ async def get_current_user_info(
     Get current authenticated user information.
     Requires valid JWT token in Authorization header.
     """
-    return {
-        "username": current_user.username,
-        "user_id": current_user.user_id,
-        "expires_at": current_user.expires_at,
-        "message": "Authentication successful"
-    }
+    return UserInfoResponse(
+        username=current_user.username,
+        user_id=current_user.user_id,
+        expires_at=current_user.expires_at
+    )
 
 
 @router.post("/auth/logout")
@@ -78,7 +101,7 @@ async def logout():
     Logout endpoint. 
     Note: JWT tokens are stateless, so logout is handled client-side by discarding the token.
     """
-    return {"message": "Logout successful. Please discard your token on the client side."}
+    return Response(content=_LOGOUT_BODY, media_type="application/json")
 
 
 # Protected endpoint example
@@ -104,8 +127,11 @@ async def protected_endpoint(
 # Checklist generation endpoints
 @router.post(
     "/generate-checklist",
-    response_model=ChecklistGenerationResponse,
+    # The generator already builds the response model, so FastAPI's second
+    # validation pass is skipped and the model serializes itself
+    response_model=None,
     responses={
+        200: {"model": ChecklistGenerationResponse, "description": "Generated checklist"},
         400: {"model": ErrorResponse, "description": "Invalid request data"},
         401: {"model": ErrorResponse, "description": "Authentication required"},
         422: {"model": ErrorResponse, "description": "Validation error"},
@@ -115,7 +141,8 @@ async def protected_endpoint(
 )
 async def generate_checklist(
     request: ChecklistGenerationRequest,
-    current_user: TokenData = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_user),
+    batcher: ChecklistBatcher = Depends(get_checklist_batcher)
 ):
     """
     Generate a personalized trip checklist using AI.
@@ -138,43 +165,34 @@ async def generate_checklist(
     - Provides detailed error messages for debugging
     """
     try:
-        logger.info(f"Generating checklist for user {current_user.username}")
-        logger.debug(f"Trip data: {request.trip_data.location}, {request.trip_data.days} days")
+        logger.info("Generating checklist for user %s", current_user.username)
+        logger.debug("Trip data: %s, %d days", request.trip_data.location, request.trip_data.days)
         
-        # Create checklist generator service
-        generator = create_checklist_generator(groq_client)
+        # The generator and its response model work on the response-side trip model
+        trip_data = TripDataResponse.model_validate(request.trip_data.model_dump())
         
-        # Generate the checklist
-        checklist_response = await generator.generate_checklist(request.trip_data)
+        # Generate the checklist (batched with concurrent requests)
+        checklist_response = await batcher.submit(trip_data)
         
-        logger.info(f"Successfully generated checklist with {len(checklist_response.items)} items")
-        return checklist_response
+        logger.info("Successfully generated checklist with %d items", len(checklist_response.items))
+        return Response(content=checklist_response.model_dump_json(), media_type="application/json")
         
     except ChecklistGenerationError as e:
-        logger.error(f"Checklist generation error for user {current_user.username}: {str(e)}")
+        logger.error("Checklist generation error for user %s: %s", current_user.username, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to generate checklist: {str(e)}"
         )
     
     except GroqRateLimitError:
-        logger.warning(f"Rate limit exceeded for user {current_user.username}")
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Service temporarily unavailable due to rate limiting. Please try again later."
-        )
+        logger.warning("Rate limit exceeded for user %s", current_user.username)
+        raise _checklist_error(status.HTTP_503_SERVICE_UNAVAILABLE, _RATE_LIMIT_DETAIL) from None
     
     except GroqAPIError as e:
-        logger.error(f"Groq API error for user {current_user.username}: {str(e)}")
+        logger.error("Groq API error for user %s: %s", current_user.username, e)
         # Don't expose internal API errors to the client
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="AI service temporarily unavailable. Please try again later."
-        )
+        raise _checklist_error(status.HTTP_503_SERVICE_UNAVAILABLE, _AI_UNAVAILABLE_DETAIL) from None
     
     except Exception as e:
-        logger.error(f"Unexpected error during checklist generation for user {current_user.username}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An unexpected error occurred. Please try again later."
-        )
\ No newline at end of file
+        logger.error("Unexpected error during checklist generation for user %s: %s", current_user.username, e)
+        raise _checklist_error(status.HTTP_500_INTERNAL_SERVER_ERROR, _UNEXPECTED_DETAIL) from None
\ No newline at end of file
@@ -2,6 +2,7 @@
 Authentication middleware and dependencies for FastAPI.
 """
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 
@@ -9,8 +10,20 @@ from app.services.auth import auth_service
 from app.models.auth import TokenData, UserResponse
 
 
-# HTTP Bearer token scheme
+# HTTP Bearer token schemes
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+
+async def _verify_cached(token: str) -> TokenData:
+    """
+    Verify a JWT token, reusing the result of a recent successful verification.
+    Cache misses are verified in the threadpool to keep the event loop free.
+    """
+    token_data = auth_service.get_cached_token(token)
+    if token_data is not None:
+        return token_data
+    return await run_in_threadpool(auth_service.verify_token, token)
 
 
 async def get_current_user(
@@ -20,7 +33,7 @@ async def get_current_user(
     Dependency to get the current authenticated user from JWT token.
     """
     token = credentials.credentials
-    token_data = auth_service.verify_token(token)
+    token_data = await _verify_cached(token)
     return token_data
 
 
@@ -38,7 +51,7 @@ async def get_current_active_user(
 
 # Optional authentication dependency
 async def get_current_user_optional(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
 ) -> Optional[TokenData]:
     """
     Optional authentication dependency that doesn't raise an error if no token is provided.
@@ -48,7 +61,7 @@ async def get_current_user_optional(
     
     try:
         token = credentials.credentials
-        token_data = auth_service.verify_token(token)
+        token_data = await _verify_cached(token)
         return token_data
     except HTTPException:
         return None
\ No newline at end of file
@@ -1,10 +1,15 @@
-from pydantic_settings import BaseSettings
-from typing import List, Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import cached_property
+from typing import List, Optional, Tuple
+import logging
 import secrets
 import os
 
 
 class Settings(BaseSettings):
+    # Environment variables override settings; booleans such as DEBUG accept true/1/yes/on
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
+    
     # API Configuration
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "AI Trip Checklist API"
@@ -14,17 +19,24 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     WORKERS: int = 1
+    UDS_PATH: Optional[str] = None  # bind to this unix socket instead of HOST:PORT
     
     # CORS Configuration
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:19006,exp://localhost:19000"
     
-    @property
+    @cached_property
     def allowed_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
     
     # Security
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Reusing a verified token skips the signature check, so a disabled user can
+    # keep authenticating for up to JWT_CACHE_TTL seconds per worker; opt in
+    JWT_CACHE_ENABLED: bool = False
+    JWT_CACHE_TTL: int = 5  # seconds a verified token is reused when the cache is enabled
+    JWT_CACHE_MAX: int = 10000
+    BCRYPT_ROUNDS: int = 12
     
     # Rate Limiting
     RATE_LIMIT_REQUESTS: int = 100
@@ -35,6 +47,12 @@ class Settings(BaseSettings):
     GROQ_MODEL: str = "llama3-8b-8192"
     GROQ_TIMEOUT: int = 30
     GROQ_MAX_RETRIES: int = 3
+    GROQ_MAX_CONNECTIONS: int = 100
+    GROQ_MAX_KEEPALIVE_CONNECTIONS: int = 50
+    GROQ_HTTP2: bool = False  # needs the h2 package (httpx[http2])
+    
+    # Checklist generation batching
+    CHECKLIST_BATCH_SIZE: int = 8
     
     # Environment
     ENVIRONMENT: str = "development"
@@ -54,41 +72,33 @@ class Settings(BaseSettings):
     
     # Health Check
     HEALTH_CHECK_TIMEOUT: int = 5
+    HEALTH_CACHE_TTL: float = 0.5  # seconds a /health result is reused; 0 disables the cache
     
-    @property
+    @cached_property
     def is_production(self) -> bool:
         return self.ENVIRONMENT.lower() == "production"
     
-    @property
+    @cached_property
     def is_development(self) -> bool:
         return self.ENVIRONMENT.lower() == "development"
     
-    @property
+    @cached_property
     def log_level_numeric(self) -> int:
-        import logging
         return getattr(logging, self.LOG_LEVEL.upper(), logging.INFO)
     
-    def get_cors_origins(self) -> List[str]:
-        """Get CORS origins with production-safe defaults"""
+    @cached_property
+    def cors_origins(self) -> Tuple[str, ...]:
+        """Normalized CORS origins with production-safe defaults, computed once"""
+        # Trailing slashes never match a browser's Origin header, so strip them up front
+        origins = (origin.rstrip("/") for origin in self.allowed_origins_list)
         if self.is_production:
-            # In production, be more restrictive with CORS
-            origins = self.allowed_origins_list
-            # Filter out localhost origins in production
-            return [origin for origin in origins if not origin.startswith("http://localhost")]
-        return self.allowed_origins_list
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
-        
-        # Allow environment variables to override settings
-        @classmethod
-        def parse_env_var(cls, field_name: str, raw_val: str) -> any:
-            if field_name == 'DEBUG':
-                return raw_val.lower() in ('true', '1', 'yes', 'on')
-            if field_name == 'ENABLE_METRICS':
-                return raw_val.lower() in ('true', '1', 'yes', 'on')
-            return cls.json_loads(raw_val)
+            # In production, filter out localhost origins
+            return tuple(origin for origin in origins if not origin.startswith("http://localhost"))
+        return tuple(origins)
+    
+    def get_cors_origins(self) -> Tuple[str, ...]:
+        """Get CORS origins with production-safe defaults"""
+        return self.cors_origins
 
 
 # Create settings instance
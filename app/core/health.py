@@ -1,15 +1,40 @@
 import asyncio
 import time
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime, timezone
 import httpx
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
 from .config import settings
 
 logger = logging.getLogger(__name__)
 
+GROQ_MODELS_URL = "https://api.groq.com/openai/v1/models"
+_GROQ_AUTH_HEADERS = {"Authorization": f"Bearer {settings.GROQ_API_KEY}"}
+
+# Shared client so health probes reuse pooled keep-alive connections
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client used by health checks, creating it on first use"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(5.0),
+            limits=httpx.Limits(max_keepalive_connections=10)
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (called on application shutdown)"""
+    if _http_client is not None:
+        await _http_client.aclose()
+
 
 class HealthStatus(str, Enum):
     HEALTHY = "healthy"
@@ -17,14 +42,15 @@ class HealthStatus(str, Enum):
     DEGRADED = "degraded"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class HealthCheck:
     name: str
     status: HealthStatus
     message: str
-    duration_ms: float
-    timestamp: datetime
     details: Optional[Dict[str, Any]] = None
+    # Filled in by HealthChecker.run_check, so checks do not read the clock themselves
+    duration_ms: float = 0
+    timestamp: Optional[datetime] = None
 
 
 class HealthChecker:
@@ -39,18 +65,21 @@ class HealthChecker:
         self.checks[name] = check_func
         logger.info(f"Registered health check: {name}")
     
-    async def run_check(self, name: str) -> HealthCheck:
-        """Run a single health check"""
+    async def run_check(self, name: str, now: Optional[datetime] = None) -> HealthCheck:
+        """Run a single health check, stamping the result with `now` (defaults to current time)"""
+        if now is None:
+            now = datetime.now(timezone.utc)
+        
         if name not in self.checks:
             return HealthCheck(
                 name=name,
                 status=HealthStatus.UNHEALTHY,
                 message=f"Health check '{name}' not found",
                 duration_ms=0,
-                timestamp=datetime.now(timezone.utc)
+                timestamp=now
             )
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         try:
             # Run the check with timeout
             result = await asyncio.wait_for(
@@ -58,19 +87,17 @@ class HealthChecker:
                 timeout=settings.HEALTH_CHECK_TIMEOUT
             )
             
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = (time.perf_counter() - start_time) * 1000
             
             if isinstance(result, HealthCheck):
-                result.duration_ms = duration_ms
-                result.timestamp = datetime.now(timezone.utc)
-                return result
+                return replace(result, duration_ms=duration_ms, timestamp=now)
             elif isinstance(result, bool):
                 return HealthCheck(
                     name=name,
                     status=HealthStatus.HEALTHY if result else HealthStatus.UNHEALTHY,
                     message="OK" if result else "Check failed",
                     duration_ms=duration_ms,
-                    timestamp=datetime.now(timezone.utc)
+                    timestamp=now
                 )
             else:
                 return HealthCheck(
@@ -78,47 +105,48 @@ class HealthChecker:
                     status=HealthStatus.HEALTHY,
                     message=str(result) if result else "OK",
                     duration_ms=duration_ms,
-                    timestamp=datetime.now(timezone.utc)
+                    timestamp=now
                 )
         
         except asyncio.TimeoutError:
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = (time.perf_counter() - start_time) * 1000
             return HealthCheck(
                 name=name,
                 status=HealthStatus.UNHEALTHY,
                 message=f"Health check timed out after {settings.HEALTH_CHECK_TIMEOUT}s",
                 duration_ms=duration_ms,
-                timestamp=datetime.now(timezone.utc)
+                timestamp=now
             )
         
         except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = (time.perf_counter() - start_time) * 1000
             logger.error(f"Health check '{name}' failed: {e}")
             return HealthCheck(
                 name=name,
                 status=HealthStatus.UNHEALTHY,
                 message=f"Check failed: {str(e)}",
                 duration_ms=duration_ms,
-                timestamp=datetime.now(timezone.utc)
+                timestamp=now
             )
     
     async def run_all_checks(self) -> Dict[str, HealthCheck]:
         """Run all registered health checks"""
         results = {}
+        now = datetime.now(timezone.utc)
         
         # Run checks concurrently
-        tasks = [self.run_check(name) for name in self.checks.keys()]
+        names = list(self.checks.keys())
+        tasks = [self.run_check(name, now) for name in names]
         check_results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        for i, result in enumerate(check_results):
-            name = list(self.checks.keys())[i]
+        for name, result in zip(names, check_results):
             if isinstance(result, Exception):
                 results[name] = HealthCheck(
                     name=name,
                     status=HealthStatus.UNHEALTHY,
                     message=f"Check failed with exception: {str(result)}",
                     duration_ms=0,
-                    timestamp=datetime.now(timezone.utc)
+                    timestamp=now
                 )
             else:
                 results[name] = result
@@ -132,14 +160,14 @@ class HealthChecker:
         if not results:
             return HealthStatus.HEALTHY
         
-        statuses = [check.status for check in results.values()]
+        degraded = False
+        for check in results.values():
+            if check.status is HealthStatus.UNHEALTHY:
+                return HealthStatus.UNHEALTHY
+            if check.status is HealthStatus.DEGRADED:
+                degraded = True
         
-        if HealthStatus.UNHEALTHY in statuses:
-            return HealthStatus.UNHEALTHY
-        elif HealthStatus.DEGRADED in statuses:
-            return HealthStatus.DEGRADED
-        else:
-            return HealthStatus.HEALTHY
+        return HealthStatus.DEGRADED if degraded else HealthStatus.HEALTHY
 
 
 # Global health checker instance
@@ -153,8 +181,6 @@ async def basic_health_check() -> HealthCheck:
         name="basic",
         status=HealthStatus.HEALTHY,
         message="Application is running",
-        duration_ms=0,
-        timestamp=datetime.now(timezone.utc),
         details={
             "version": settings.VERSION,
             "environment": settings.ENVIRONMENT,
@@ -170,44 +196,32 @@ async def groq_api_health_check() -> HealthCheck:
             name="groq_api",
             status=HealthStatus.DEGRADED,
             message="Groq API key not configured",
-            duration_ms=0,
-            timestamp=datetime.now(timezone.utc)
         )
     
     try:
         # Simple connectivity test (you might want to use actual Groq client here)
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(
-                "https://api.groq.com/openai/v1/models",
-                headers={"Authorization": f"Bearer {settings.GROQ_API_KEY}"}
+        response = await get_http_client().get(GROQ_MODELS_URL, headers=_GROQ_AUTH_HEADERS)
+        
+        if response.status_code == 200:
+            return HealthCheck(
+                name="groq_api",
+                status=HealthStatus.HEALTHY,
+                message="Groq API is accessible",
+                details={"status_code": response.status_code}
+            )
+        else:
+            return HealthCheck(
+                name="groq_api",
+                status=HealthStatus.DEGRADED,
+                message=f"Groq API returned status {response.status_code}",
+                details={"status_code": response.status_code}
             )
-            
-            if response.status_code == 200:
-                return HealthCheck(
-                    name="groq_api",
-                    status=HealthStatus.HEALTHY,
-                    message="Groq API is accessible",
-                    duration_ms=0,
-                    timestamp=datetime.now(timezone.utc),
-                    details={"status_code": response.status_code}
-                )
-            else:
-                return HealthCheck(
-                    name="groq_api",
-                    status=HealthStatus.DEGRADED,
-                    message=f"Groq API returned status {response.status_code}",
-                    duration_ms=0,
-                    timestamp=datetime.now(timezone.utc),
-                    details={"status_code": response.status_code}
-                )
     
     except Exception as e:
         return HealthCheck(
             name="groq_api",
             status=HealthStatus.UNHEALTHY,
             message=f"Cannot connect to Groq API: {str(e)}",
-            duration_ms=0,
-            timestamp=datetime.now(timezone.utc)
         )
 
 
@@ -230,8 +244,6 @@ async def memory_health_check() -> HealthCheck:
             name="memory",
             status=status,
             message=f"Memory usage: {memory_percent:.1f}%",
-            duration_ms=0,
-            timestamp=datetime.now(timezone.utc),
             details={
                 "memory_percent": memory_percent,
                 "memory_rss": memory_info.rss,
@@ -244,8 +256,6 @@ async def memory_health_check() -> HealthCheck:
             name="memory",
             status=HealthStatus.DEGRADED,
             message="psutil not available for memory monitoring",
-            duration_ms=0,
-            timestamp=datetime.now(timezone.utc)
         )
     
     except Exception as e:
@@ -253,8 +263,6 @@ async def memory_health_check() -> HealthCheck:
             name="memory",
             status=HealthStatus.UNHEALTHY,
             message=f"Memory check failed: {str(e)}",
-            duration_ms=0,
-            timestamp=datetime.now(timezone.utc)
         )
 
 
@@ -287,10 +295,84 @@ async def get_health_status() -> Dict[str, Any]:
     }
 
 
+# Latest health status and the monotonic time it expires, shared by concurrent probes
+_health_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+_health_lock = asyncio.Lock()
+
+
+async def get_cached_health_status(ttl: Optional[float] = None) -> Dict[str, Any]:
+    """Get health status, reusing the last result for `ttl` seconds (defaults to HEALTH_CACHE_TTL)"""
+    global _health_cache
+    if ttl is None:
+        ttl = settings.HEALTH_CACHE_TTL
+    if ttl <= 0:
+        return await get_health_status()
+    
+    cached = _health_cache
+    if cached is not None and time.monotonic() < cached[0]:
+        return cached[1]
+    
+    async with _health_lock:
+        # Another probe may have refreshed the status while we waited
+        cached = _health_cache
+        if cached is not None and time.monotonic() < cached[0]:
+            return cached[1]
+        
+        status = await get_health_status()
+        _health_cache = (time.monotonic() + ttl, status)
+        return status
+
+
+LIVENESS_PATH = "/health/live"
+_LIVENESS_HEADERS = [(b"content-type", b"application/json")]
+
+
+class LivenessFastPathMiddleware:
+    """
+    Outermost ASGI middleware answering liveness probes directly.
+    
+    Liveness only shows that the process can serve requests, so the probe
+    skips the rest of the middleware stack and routing. CORS preflights
+    already short-circuit in CORSMiddleware, which sits right inside this one.
+    The serialized body is reused for up to a second before being rebuilt.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._refresh_at = 0.0
+        self._body = b""
+        self._headers: List[Tuple[bytes, bytes]] = _LIVENESS_HEADERS
+    
+    def _current_response(self) -> Tuple[bytes, List[Tuple[bytes, bytes]]]:
+        """Return the cached body and headers, rebuilding them once per second"""
+        now = time.time()
+        if now >= self._refresh_at:
+            self._body = orjson.dumps({"status": "alive", "timestamp": now})
+            self._headers = [*_LIVENESS_HEADERS, (b"content-length", str(len(self._body)).encode())]
+            self._refresh_at = now + 1.0
+        return self._body, self._headers
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] != LIVENESS_PATH or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        
+        body, headers = self._current_response()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": headers
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
 __all__ = [
     "HealthStatus",
     "HealthCheck", 
     "HealthChecker",
     "health_checker",
-    "get_health_status"
+    "get_health_status",
+    "get_cached_health_status",
+    "LivenessFastPathMiddleware",
+    "close_http_client"
 ]
\ No newline at end of file
@@ -1,11 +1,67 @@
+import atexit
+import copy
 import logging
 import logging.handlers
+import queue
 import sys
+import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from .config import settings
 
 
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that reuses the formatted timestamp for records logged in the same second"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._time_cache = (None, "")
+    
+    def formatTime(self, record: logging.LogRecord, datefmt: str = None) -> str:
+        # Without a datefmt the default format includes milliseconds, so it can't be shared
+        if not datefmt:
+            return super().formatTime(record, datefmt)
+        
+        second = int(record.created)
+        cached_second, cached_text = self._time_cache
+        if second != cached_second:
+            cached_text = time.strftime(datefmt, self.converter(record.created))
+            self._time_cache = (second, cached_text)
+        return cached_text
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener thread.
+    
+    The stock QueueHandler formats each record, traceback included, in the
+    logging thread before enqueueing it. Only the message is merged here;
+    exc_info is passed through so tracebacks are rendered off the request path.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        return record
+
+
+# Background thread writing queued log records to the real handlers
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _stop_queue_listener() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+atexit.register(_stop_queue_listener)
+
+
 def setup_logging() -> None:
     """Configure logging for the application"""
     
@@ -14,25 +70,29 @@ def setup_logging() -> None:
         log_path = Path(settings.LOG_FILE)
         log_path.parent.mkdir(parents=True, exist_ok=True)
     
+    log_level = settings.log_level_numeric
+    
     # Configure root logger
     root_logger = logging.getLogger()
-    root_logger.setLevel(settings.log_level_numeric)
+    root_logger.setLevel(log_level)
     
     # Remove existing handlers
+    _stop_queue_listener()
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
+    handlers = []
     
     # Create formatter
-    formatter = logging.Formatter(
+    formatter = CachedTimeFormatter(
         fmt=settings.LOG_FORMAT,
         datefmt="%Y-%m-%d %H:%M:%S"
     )
     
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(settings.log_level_numeric)
+    console_handler.setLevel(log_level)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    handlers.append(console_handler)
     
     # File handler (if specified)
     if settings.LOG_FILE:
@@ -42,9 +102,16 @@ def setup_logging() -> None:
             backupCount=5,
             encoding='utf-8'
         )
-        file_handler.setLevel(settings.log_level_numeric)
+        file_handler.setLevel(log_level)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    # Log calls only enqueue the record; formatting and I/O happen on the listener thread
+    global _queue_listener
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(DeferredQueueHandler(log_queue))
+    _queue_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
     
     # Configure specific loggers
     configure_logger_levels()
@@ -88,14 +155,28 @@ def get_logger(name: str) -> logging.Logger:
 class StructuredLogger:
     """Structured logger for better log analysis"""
     
+    # Constant portion of each event's extra fields, shared across calls
+    _HTTP_REQUEST_EXTRA = {"event_type": "http_request"}
+    _API_CALL_EXTRA = {"event_type": "api_call"}
+    _BUSINESS_EVENT_EXTRA = {"event_type": "business_event"}
+    
     def __init__(self, name: str):
         self.logger = logging.getLogger(name)
     
     def log_request(self, method: str, path: str, status_code: int, 
                    duration: float, user_id: str = None) -> None:
         """Log HTTP request with structured data"""
+        level = logging.INFO
+        if status_code >= 500:
+            level = logging.ERROR
+        elif status_code >= 400:
+            level = logging.WARNING
+        
+        if not self.logger.isEnabledFor(level):
+            return
+        
         extra = {
-            "event_type": "http_request",
+            **self._HTTP_REQUEST_EXTRA,
             "method": method,
             "path": path,
             "status_code": status_code,
@@ -103,12 +184,6 @@ class StructuredLogger:
             "user_id": user_id,
         }
         
-        level = logging.INFO
-        if status_code >= 500:
-            level = logging.ERROR
-        elif status_code >= 400:
-            level = logging.WARNING
-        
         self.logger.log(
             level,
             f"{method} {path} - {status_code} - {duration:.3f}s",
@@ -118,8 +193,12 @@ class StructuredLogger:
     def log_api_call(self, service: str, operation: str, 
                     duration: float, success: bool, error: str = None) -> None:
         """Log external API call"""
+        level = logging.INFO if success else logging.ERROR
+        if not self.logger.isEnabledFor(level):
+            return
+        
         extra = {
-            "event_type": "api_call",
+            **self._API_CALL_EXTRA,
             "service": service,
             "operation": operation,
             "duration": duration,
@@ -127,7 +206,6 @@ class StructuredLogger:
             "error": error,
         }
         
-        level = logging.INFO if success else logging.ERROR
         message = f"{service}.{operation} - {'SUCCESS' if success else 'FAILED'} - {duration:.3f}s"
         if error:
             message += f" - {error}"
@@ -136,8 +214,11 @@ class StructuredLogger:
     
     def log_business_event(self, event: str, user_id: str = None, **kwargs) -> None:
         """Log business events for analytics"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        
         extra = {
-            "event_type": "business_event",
+            **self._BUSINESS_EVENT_EXTRA,
             "event": event,
             "user_id": user_id,
             **kwargs
@@ -146,15 +227,50 @@ class StructuredLogger:
         self.logger.info(f"Business Event: {event}", extra=extra)
 
 
+class RequestLoggingMiddleware:
+    """Pure ASGI middleware logging each HTTP request with its status and duration"""
+    
+    def __init__(self, app: ASGIApp, logger: StructuredLogger):
+        self.app = app
+        self.logger = logger
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Health probes are frequent and uninteresting, so they are not logged
+        if scope["type"] != "http" or scope["path"].startswith("/health"):
+            await self.app(scope, receive, send)
+            return
+        
+        start_time = time.perf_counter()
+        status_code = 500
+        
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        await self.app(scope, receive, send_with_status)
+        
+        self.logger.log_request(
+            method=scope["method"],
+            path=scope["path"],
+            status_code=status_code,
+            duration=time.perf_counter() - start_time
+        )
+
+
 # Create application-specific loggers
 app_logger = StructuredLogger("app")
 api_logger = StructuredLogger("api")
 groq_logger = StructuredLogger("groq")
 
 __all__ = [
+    "CachedTimeFormatter",
+    "DeferredQueueHandler",
     "setup_logging",
     "get_logger",
     "StructuredLogger",
+    "RequestLoggingMiddleware",
     "app_logger",
     "api_logger", 
     "groq_logger"
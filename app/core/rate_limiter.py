@@ -1,76 +1,93 @@
+import math
 import time
-import asyncio
-from typing import Dict, Tuple, Optional
-from fastapi import Request, HTTPException
-from fastapi.responses import JSONResponse
+import zlib
+from typing import List, Tuple, Optional
+import orjson
+from cachetools import TTLCache
+from fastapi import Request, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import logging
 from .config import settings
 
 logger = logging.getLogger(__name__)
 
+# Health checks and internal endpoints are never rate limited
+_SKIP_PATHS = frozenset({"/health", "/", "/docs", "/redoc", "/openapi.json"})
+
+# Body of every 429 response; only the rate limit headers differ per client
+_RATE_LIMITED_BODY = orjson.dumps({
+    "error": "RATE_LIMIT_EXCEEDED",
+    "message": "Too many requests. Please try again later.",
+    "code": 429
+})
+
 
 class RateLimiter:
-    """Simple in-memory rate limiter"""
+    """
+    Simple in-memory token bucket rate limiter.
+    
+    Each client's bucket holds up to requests_per_window tokens and refills
+    continuously at requests_per_window / window_seconds tokens per second.
+    Buckets are refilled lazily when their client makes a request.
+    """
+    
+    # Upper bound on tracked clients; the least recently used client is evicted first
+    MAX_CLIENTS = 100_000
     
     def __init__(self, requests_per_window: int, window_seconds: int):
         self.requests_per_window = requests_per_window
         self.window_seconds = window_seconds
-        self.clients: Dict[str, Tuple[int, float]] = {}  # client_id -> (request_count, window_start)
-        self._lock = asyncio.Lock()
+        self.refill_rate = requests_per_window / window_seconds
+        # client_id -> (tokens, last_refill). An idle bucket is full again after one
+        # window, so entries expire then; a missing entry is treated as a full bucket
+        self.clients: TTLCache = TTLCache(maxsize=self.MAX_CLIENTS, ttl=window_seconds)
+        # Buckets are tracked on the monotonic clock; this converts them back to epoch seconds
+        self._monotonic_to_epoch_offset = time.time() - time.monotonic()
+        # Header values that never change, encoded once
+        self._limit_header = str(requests_per_window).encode("latin-1")
+        self._window_header = str(window_seconds).encode("latin-1")
     
-    async def is_allowed(self, client_id: str) -> Tuple[bool, Dict[str, any]]:
+    def is_allowed(self, client_id: str) -> Tuple[bool, List[Tuple[bytes, bytes]]]:
         """Check if client is allowed to make a request"""
-        async with self._lock:
-            current_time = time.time()
-            
-            if client_id not in self.clients:
-                # First request from this client
-                self.clients[client_id] = (1, current_time)
-                return True, self._get_headers(1, current_time)
-            
-            request_count, window_start = self.clients[client_id]
-            
-            # Check if we're in a new window
-            if current_time - window_start >= self.window_seconds:
-                # New window, reset counter
-                self.clients[client_id] = (1, current_time)
-                return True, self._get_headers(1, current_time)
-            
-            # Same window, check if limit exceeded
-            if request_count >= self.requests_per_window:
-                # Rate limit exceeded
-                return False, self._get_headers(request_count, window_start)
-            
-            # Increment counter
-            self.clients[client_id] = (request_count + 1, window_start)
-            return True, self._get_headers(request_count + 1, window_start)
+        current_time = time.monotonic()
+        allowed, tokens = self._decide(client_id, current_time)
+        return allowed, self._get_headers(allowed, tokens, current_time)
     
-    def _get_headers(self, current_requests: int, window_start: float) -> Dict[str, any]:
-        """Get rate limit headers"""
-        remaining = max(0, self.requests_per_window - current_requests)
-        reset_time = int(window_start + self.window_seconds)
+    def _decide(self, client_id: str, current_time: float) -> Tuple[bool, float]:
+        """Record a request and return (allowed, tokens left in the bucket)"""
+        # Only the read-modify-write of the client entry happens here; keep it free of awaits
+        capacity = self.requests_per_window
+        bucket = self.clients.get(client_id)
+        if bucket is None:
+            tokens = capacity
+        else:
+            tokens, last_refill = bucket
+            tokens = min(capacity, tokens + (current_time - last_refill) * self.refill_rate)
         
-        return {
-            "X-RateLimit-Limit": str(self.requests_per_window),
-            "X-RateLimit-Remaining": str(remaining),
-            "X-RateLimit-Reset": str(reset_time),
-            "X-RateLimit-Window": str(self.window_seconds),
-        }
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        
+        self.clients[client_id] = (tokens, current_time)
+        return allowed, tokens
     
-    async def cleanup_expired_clients(self):
-        """Remove expired client entries to prevent memory leaks"""
-        async with self._lock:
-            current_time = time.time()
-            expired_clients = [
-                client_id for client_id, (_, window_start) in self.clients.items()
-                if current_time - window_start >= self.window_seconds * 2
-            ]
-            
-            for client_id in expired_clients:
-                del self.clients[client_id]
-            
-            if expired_clients:
-                logger.debug(f"Cleaned up {len(expired_clients)} expired rate limit entries")
+    def _get_headers(self, allowed: bool, tokens: float, current_time: float) -> List[Tuple[bytes, bytes]]:
+        """Get rate limit headers as raw ASGI header pairs"""
+        # Reset is when the bucket will be full again, in epoch seconds
+        refill_seconds = (self.requests_per_window - tokens) / self.refill_rate
+        reset_time = math.ceil(current_time + self._monotonic_to_epoch_offset + refill_seconds)
+        
+        headers = [
+            (b"x-ratelimit-limit", self._limit_header),
+            (b"x-ratelimit-remaining", str(int(tokens)).encode("latin-1")),
+            (b"x-ratelimit-reset", str(reset_time).encode("latin-1")),
+            (b"x-ratelimit-window", self._window_header),
+        ]
+        if not allowed:
+            # Seconds until the next token is available
+            retry_after = math.ceil((1 - tokens) / self.refill_rate)
+            headers.append((b"retry-after", str(retry_after).encode("latin-1")))
+        return headers
 
 
 # Global rate limiter instance
@@ -80,67 +97,80 @@ rate_limiter = RateLimiter(
 )
 
 
-def get_client_id(request: Request) -> str:
-    """Extract client identifier from request"""
+def get_client_id_from_scope(scope: Scope) -> str:
+    """Extract client identifier from a raw ASGI scope"""
+    # Reuse the identifier if another middleware already computed it for this request
+    state = scope.setdefault("state", {})
+    cached = state.get("client_id")
+    if cached:
+        return cached
+    
+    forwarded_for = None
+    user_agent = b""
+    for name, value in scope.get("headers", ()):
+        if name == b"x-forwarded-for":
+            forwarded_for = value
+        elif name == b"user-agent":
+            user_agent = value
+    
     # Try to get real IP from headers (for reverse proxy setups)
-    forwarded_for = request.headers.get("X-Forwarded-For")
     if forwarded_for:
         # Take the first IP in the chain
-        client_ip = forwarded_for.split(",")[0].strip()
+        client_ip = forwarded_for.split(b",")[0].strip().decode("latin-1")
     else:
-        client_ip = request.client.host if request.client else "unknown"
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
     
-    # Include user agent for better client identification
-    user_agent = request.headers.get("User-Agent", "")[:50]  # Truncate to prevent abuse
-    
-    return f"{client_ip}:{hash(user_agent) % 10000}"
+    # Include user agent for better client identification; truncate to prevent abuse.
+    # crc32 is stable across processes, unlike the salted built-in hash()
+    client_id = f"{client_ip}:{zlib.crc32(user_agent[:50]) & 0x3FFF}"
+    state["client_id"] = client_id
+    return client_id
 
 
-async def rate_limit_middleware(request: Request, call_next):
-    """Rate limiting middleware"""
-    
-    # Skip rate limiting for health checks and internal endpoints
-    if request.url.path in ["/health", "/", "/docs", "/redoc", "/openapi.json"]:
-        return await call_next(request)
+def get_client_id(request: Request) -> str:
+    """Extract client identifier from request"""
+    return get_client_id_from_scope(request.scope)
+
+
+class RateLimitMiddleware:
+    """Pure ASGI rate limiting middleware"""
     
-    client_id = get_client_id(request)
+    def __init__(self, app: ASGIApp, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
     
-    try:
-        allowed, headers = await rate_limiter.is_allowed(client_id)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Skip rate limiting for non-HTTP traffic, health checks and internal endpoints
+        if scope["type"] != "http" or scope["path"] in _SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
+        
+        client_id = get_client_id_from_scope(scope)
+        
+        try:
+            allowed, headers = self.limiter.is_allowed(client_id)
+        except Exception as e:
+            logger.error(f"Rate limiter error: {e}")
+            # If rate limiter fails, allow the request to proceed
+            await self.app(scope, receive, send)
+            return
         
         if not allowed:
-            logger.warning(f"Rate limit exceeded for client {client_id} on {request.url.path}")
-            return JSONResponse(
+            logger.warning(f"Rate limit exceeded for client {client_id} on {scope['path']}")
+            response = Response(
+                content=_RATE_LIMITED_BODY,
                 status_code=429,
-                content={
-                    "error": "RATE_LIMIT_EXCEEDED",
-                    "message": "Too many requests. Please try again later.",
-                    "code": 429
-                },
-                headers=headers
+                media_type="application/json"
             )
+            response.raw_headers.extend(headers)
+            await response(scope, receive, send)
+            return
         
-        # Process the request
-        response = await call_next(request)
+        async def send_with_headers(message: Message) -> None:
+            # Add rate limit headers to response
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *headers]
+            await send(message)
         
-        # Add rate limit headers to response
-        for key, value in headers.items():
-            response.headers[key] = value
-        
-        return response
-        
-    except Exception as e:
-        logger.error(f"Rate limiter error: {e}")
-        # If rate limiter fails, allow the request to proceed
-        return await call_next(request)
-
-
-async def cleanup_rate_limiter():
-    """Periodic cleanup task for rate limiter"""
-    while True:
-        try:
-            await rate_limiter.cleanup_expired_clients()
-            await asyncio.sleep(300)  # Cleanup every 5 minutes
-        except Exception as e:
-            logger.error(f"Rate limiter cleanup error: {e}")
-            await asyncio.sleep(60)  # Retry after 1 minute on error
\ No newline at end of file
+        await self.app(scope, receive, send_with_headers)
@@ -1,6 +1,7 @@
 from fastapi import Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.security.utils import get_authorization_scheme_param
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from typing import Optional
 import logging
 from .config import settings
@@ -39,25 +40,78 @@ DEVELOPMENT_HEADERS = {
 }
 
 
-async def security_headers_middleware(request: Request, call_next):
-    """Add security headers to responses"""
-    response = await call_next(request)
-    
-    # Choose headers based on environment
-    headers = SECURITY_HEADERS if settings.is_production else DEVELOPMENT_HEADERS
-    
-    # Add security headers
-    for header, value in headers.items():
-        response.headers[header] = value
-    
-    # Add HSTS only for HTTPS in production
-    if settings.is_production and request.url.scheme == "https":
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains; preload"
+def _encode_headers(headers: dict) -> tuple:
+    """Encode a header dict into raw ASGI (name, value) byte pairs"""
+    return tuple(
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in headers.items()
+    )
+
+
+def _header_names(raw_headers: tuple) -> frozenset:
+    """Names of raw ASGI header pairs, for replacing same-named headers"""
+    return frozenset(name for name, _ in raw_headers)
+
+
+# Raw header pairs built once at import, added to each response
+_SERVER_RAW_HEADER = (b"server", b"AI-Trip-Checklist-API")
+_HSTS_RAW_HEADER = (b"strict-transport-security", b"max-age=31536000; includeSubDomains; preload")
+_SECURITY_RAW_HEADERS = _encode_headers(SECURITY_HEADERS) + (_SERVER_RAW_HEADER,)
+_DEVELOPMENT_RAW_HEADERS = _encode_headers(DEVELOPMENT_HEADERS) + (_SERVER_RAW_HEADER,)
+_HTTPS_SECURITY_RAW_HEADERS = _SECURITY_RAW_HEADERS + (_HSTS_RAW_HEADER,)
+_SECURITY_HEADER_NAMES = _header_names(_SECURITY_RAW_HEADERS)
+_DEVELOPMENT_HEADER_NAMES = _header_names(_DEVELOPMENT_RAW_HEADERS)
+_HTTPS_SECURITY_HEADER_NAMES = _header_names(_HTTPS_SECURITY_RAW_HEADERS)
+
+
+class SecurityHeadersMiddleware:
+    """Pure ASGI middleware adding security headers to responses"""
     
-    # Add server header obfuscation
-    response.headers["Server"] = "AI-Trip-Checklist-API"
+    def __init__(self, app: ASGIApp):
+        self.app = app
     
-    return response
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # Choose headers based on environment; includes server header obfuscation
+        if settings.is_production:
+            # Add HSTS only for HTTPS
+            if scope.get("scheme") == "https":
+                extra_headers, extra_names = _HTTPS_SECURITY_RAW_HEADERS, _HTTPS_SECURITY_HEADER_NAMES
+            else:
+                extra_headers, extra_names = _SECURITY_RAW_HEADERS, _SECURITY_HEADER_NAMES
+        else:
+            extra_headers, extra_names = _DEVELOPMENT_RAW_HEADERS, _DEVELOPMENT_HEADER_NAMES
+        
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # New list, so the response's own header list is left untouched;
+                # our values replace any the route set under the same name
+                message["headers"] = [
+                    *(header for header in message.get("headers") or ()
+                      if header[0].lower() not in extra_names),
+                    *extra_headers
+                ]
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
+
+
+# Common spellings of the bearer scheme, checked without lowercasing the header
+_BEARER_PREFIXES = ("Bearer ", "bearer ")
+
+
+def _scope_client_host(scope: Scope) -> str:
+    """Client address for log messages, read directly from the ASGI scope"""
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _client_host(request: Request) -> str:
+    """Client address of a request for log messages"""
+    return _scope_client_host(request.scope)
 
 
 class CustomHTTPBearer(HTTPBearer):
@@ -71,45 +125,73 @@ class CustomHTTPBearer(HTTPBearer):
         
         if not authorization:
             if self.auto_error:
-                logger.warning(f"Missing Authorization header from {request.client.host if request.client else 'unknown'}")
+                logger.warning(f"Missing Authorization header from {_client_host(request)}")
             return None
         
+        # Fast path for the usual well-formed "Bearer <token>" header
+        if authorization.startswith(_BEARER_PREFIXES) and len(authorization) > 7:
+            return HTTPAuthorizationCredentials(scheme=authorization[:6], credentials=authorization[7:])
+        
+        # Fall back to the full parser for anything unusual, so it is logged accurately
         scheme, credentials = get_authorization_scheme_param(authorization)
         
         if not (authorization and scheme and credentials):
             if self.auto_error:
-                logger.warning(f"Invalid Authorization header format from {request.client.host if request.client else 'unknown'}")
+                logger.warning(f"Invalid Authorization header format from {_client_host(request)}")
             return None
         
         if scheme.lower() != "bearer":
             if self.auto_error:
-                logger.warning(f"Invalid Authorization scheme '{scheme}' from {request.client.host if request.client else 'unknown'}")
+                logger.warning(f"Invalid Authorization scheme '{scheme}' from {_client_host(request)}")
             return None
         
         return HTTPAuthorizationCredentials(scheme=scheme, credentials=credentials)
 
 
-def validate_request_size(max_size: int = 10 * 1024 * 1024):  # 10MB default
-    """Middleware to validate request size"""
-    async def middleware(request: Request, call_next):
-        content_length = request.headers.get("content-length")
+# Methods whose requests carry no body, so there is no size to check
+_BODYLESS_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Pre-encoded body for requests rejected as too large
+_TOO_LARGE_BODY = b'{"error": "REQUEST_TOO_LARGE", "message": "Request body too large"}'
+
+
+class RequestSizeMiddleware:
+    """Pure ASGI middleware rejecting requests whose Content-Length exceeds max_size"""
+    
+    def __init__(self, app: ASGIApp, max_size: int = 10 * 1024 * 1024):  # 10MB default
+        self.app = app
+        self.max_size = max_size
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in _BODYLESS_METHODS:
+            await self.app(scope, receive, send)
+            return
         
-        if content_length:
-            try:
-                size = int(content_length)
-                if size > max_size:
-                    logger.warning(f"Request too large: {size} bytes from {request.client.host if request.client else 'unknown'}")
-                    return Response(
-                        content='{"error": "REQUEST_TOO_LARGE", "message": "Request body too large"}',
+        # Read Content-Length straight from the raw headers; the body is never buffered
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    size = int(value)
+                except ValueError:
+                    logger.warning(f"Invalid Content-Length header from {_scope_client_host(scope)}")
+                    break
+                
+                if size > self.max_size:
+                    logger.warning(f"Request too large: {size} bytes from {_scope_client_host(scope)}")
+                    response = Response(
+                        content=_TOO_LARGE_BODY,
                         status_code=413,
                         media_type="application/json"
                     )
-            except ValueError:
-                logger.warning(f"Invalid Content-Length header from {request.client.host if request.client else 'unknown'}")
+                    await response(scope, receive, send)
+                    return
+                break
         
-        return await call_next(request)
-    
-    return middleware
+        await self.app(scope, receive, send)
+
+
+# Translation table deleting control characters other than tab, newline and carriage return
+_CONTROL_CHARS_TABLE = dict.fromkeys(i for i in range(32) if i not in (9, 10, 13))
 
 
 def sanitize_input(value: str, max_length: int = 1000) -> str:
@@ -122,9 +204,7 @@ def sanitize_input(value: str, max_length: int = 1000) -> str:
         value = value[:max_length]
     
     # Remove null bytes and control characters
-    value = ''.join(char for char in value if ord(char) >= 32 or char in '\t\n\r')
-    
-    return value.strip()
+    return value.translate(_CONTROL_CHARS_TABLE).strip()
 
 
 def is_safe_redirect_url(url: str, allowed_hosts: list = None) -> bool:
@@ -149,14 +229,12 @@ def is_safe_redirect_url(url: str, allowed_hosts: list = None) -> bool:
 
 # Create security instances
 security = CustomHTTPBearer(auto_error=False)
-request_size_validator = validate_request_size()
 
 __all__ = [
-    "security_headers_middleware",
+    "SecurityHeadersMiddleware",
     "CustomHTTPBearer",
-    "validate_request_size",
+    "RequestSizeMiddleware",
     "sanitize_input",
     "is_safe_redirect_url",
-    "security",
-    "request_size_validator"
+    "security"
 ]
\ No newline at end of file
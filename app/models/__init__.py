@@ -25,7 +25,8 @@ from .auth import (
     UserRegistration,
     UserResponse,
     TokenResponse,
-    TokenData
+    TokenData,
+    UserInfoResponse
 )
 
 # Common models
@@ -60,6 +61,7 @@ __all__ = [
     "UserResponse",
     "TokenResponse",
     "TokenData",
+    "UserInfoResponse",
     
     # Common models
     "ErrorDetail",
@@ -68,4 +68,14 @@ class TokenData(BaseModel):
     """Model for token payload data."""
     username: Optional[str] = None
     user_id: Optional[str] = None
-    expires_at: Optional[datetime] = None
\ No newline at end of file
+    expires_at: Optional[datetime] = None
+
+
+class UserInfoResponse(BaseModel):
+    """Response model for the current authenticated user."""
+    model_config = ConfigDict(frozen=True)
+    
+    username: str
+    user_id: Optional[str] = None
+    expires_at: Optional[datetime] = None
+    message: str = Field(default="Authentication successful")
\ No newline at end of file
@@ -5,9 +5,9 @@ from datetime import datetime
 from typing import List, Optional
 from enum import Enum
 
-from pydantic import BaseModel, Field, validator, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict
 
-from .trip import TripDataResponse
+from .trip import TripDataRequest, TripDataResponse
 
 
 class PriorityLevel(str, Enum):
@@ -113,7 +113,7 @@ class ChecklistResponse(BaseModel):
 
 class ChecklistGenerationRequest(BaseModel):
     """Request model for AI checklist generation."""
-    trip_data: TripDataResponse = Field(
+    trip_data: TripDataRequest = Field(
         ...,
         description="Trip data to generate checklist for"
     )
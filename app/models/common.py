@@ -1,12 +1,30 @@
 """
 Common Pydantic models and utilities.
 """
+import time
 from typing import List, Optional, Any, Dict
-from datetime import datetime
+from datetime import datetime, timezone
 
 from pydantic import BaseModel, Field
 
 
+# Timestamps within this many seconds of each other share one datetime instance
+_NOW_CACHE_RESOLUTION = 0.001
+_now_cache = (0.0, None)
+
+
+def _now_cached() -> datetime:
+    """Return the current naive UTC time, reusing the last value for up to 1ms."""
+    global _now_cache
+    
+    current = time.time()
+    cached_at, cached = _now_cache
+    if not 0.0 <= current - cached_at <= _NOW_CACHE_RESOLUTION:
+        cached = datetime.fromtimestamp(current, timezone.utc).replace(tzinfo=None)
+        _now_cache = (current, cached)
+    return cached
+
+
 class ErrorDetail(BaseModel):
     """Model for detailed error information."""
     field: Optional[str] = Field(
@@ -32,7 +50,7 @@ class ErrorResponse(BaseModel):
         description="Detailed error information"
     )
     timestamp: datetime = Field(
-        default_factory=datetime.utcnow,
+        default_factory=_now_cached,
         description="When the error occurred"
     )
     request_id: Optional[str] = Field(
@@ -47,7 +65,7 @@ class SuccessResponse(BaseModel):
     message: str = Field(..., description="Success message")
     data: Optional[Any] = Field(None, description="Response data")
     timestamp: datetime = Field(
-        default_factory=datetime.utcnow,
+        default_factory=_now_cached,
         description="Response timestamp"
     )
 
@@ -56,7 +74,7 @@ class HealthCheckResponse(BaseModel):
     """Health check response model."""
     status: str = Field(default="healthy", description="Service health status")
     timestamp: datetime = Field(
-        default_factory=datetime.utcnow,
+        default_factory=_now_cached,
         description="Health check timestamp"
     )
     version: Optional[str] = Field(None, description="API version")
@@ -104,10 +122,15 @@ class PaginatedResponse(BaseModel):
         total: int,
         pagination: PaginationParams
     ) -> "PaginatedResponse":
-        """Create a paginated response from items and pagination params."""
+        """
+        Create a paginated response from items and pagination params.
+        
+        Inputs are trusted and not re-validated; construct the model directly
+        when the data comes from an untrusted source.
+        """
         pages = (total + pagination.limit - 1) // pagination.limit
         
-        return cls(
+        return cls.model_construct(
             items=items,
             total=total,
             page=pagination.page,
@@ -2,10 +2,10 @@
 Trip-related Pydantic models for request/response validation.
 """
 from datetime import datetime
-from typing import List, Optional
+from typing import Annotated, List, Optional
 from enum import Enum
 
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+from pydantic import BaseModel, Field, field_validator, ConfigDict, StringConstraints
 
 
 class TransportType(str, Enum):
@@ -17,6 +17,10 @@ class TransportType(str, Enum):
     OTHER = "other"
 
 
+# A single packing preference, stripped and length-checked by pydantic-core
+PreferenceStr = Annotated[str, StringConstraints(strip_whitespace=True, max_length=50)]
+
+
 class TripDataRequest(BaseModel):
     """Request model for trip data input."""
     model_config = ConfigDict(str_strip_whitespace=True)
@@ -48,7 +52,7 @@ class TripDataRequest(BaseModel):
         max_length=500,
         description="Additional notes or special requirements"
     )
-    preferences: Optional[List[str]] = Field(
+    preferences: Optional[List[PreferenceStr]] = Field(
         None,
         max_length=10,
         description="User preferences for packing"
@@ -57,22 +61,12 @@ class TripDataRequest(BaseModel):
     @field_validator('preferences')
     @classmethod
     def validate_preferences(cls, v):
-        """Validate preferences list."""
-        if v is None:
-            return v
-        
-        # Filter out empty strings and validate length
-        filtered_prefs = []
-        for pref in v:
-            if not isinstance(pref, str):
-                raise ValueError("Each preference must be a string")
-            
-            stripped_pref = pref.strip()
-            if stripped_pref:
-                if len(stripped_pref) > 50:
-                    raise ValueError("Each preference must be less than 50 characters")
-                filtered_prefs.append(stripped_pref)
+        """Drop preferences that are empty after stripping."""
+        if not v:
+            return None
         
+        # Items are already stripped and length-checked by their type constraints
+        filtered_prefs = [pref for pref in v if pref]
         return filtered_prefs if filtered_prefs else None
 
 
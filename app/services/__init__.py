@@ -1,11 +1,22 @@
 # Business logic services
 
+from app.core.config import settings
 from .groq_client import GroqClient, GroqAPIError, GroqRateLimitError, groq_client
 from .checklist_generator import (
     ChecklistGeneratorService,
     ChecklistGenerationError,
     create_checklist_generator
 )
+from .batch import ChecklistBatcher
+
+# Shared generator instance; the service holds no per-request state
+checklist_generator = create_checklist_generator(groq_client)
+
+# Batches concurrent generation requests; started and stopped by the app lifespan
+checklist_batcher = ChecklistBatcher(
+    checklist_generator,
+    max_batch_size=settings.CHECKLIST_BATCH_SIZE
+)
 
 __all__ = [
     "GroqClient",
@@ -14,5 +25,8 @@ __all__ = [
     "groq_client",
     "ChecklistGeneratorService",
     "ChecklistGenerationError",
-    "create_checklist_generator"
+    "create_checklist_generator",
+    "checklist_generator",
+    "ChecklistBatcher",
+    "checklist_batcher"
 ]
\ No newline at end of file
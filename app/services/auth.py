@@ -1,51 +1,129 @@
 """
 Authentication service for JWT token management and user authentication.
 """
-from datetime import datetime, timedelta
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from functools import cache
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import bcrypt
+from cachetools import TLRUCache
+import jwt
+from jwt.exceptions import PyJWTError as JWTError
 from fastapi import HTTPException, status
 
 from app.core.config import settings
 from app.models.auth import TokenData, UserCredentials, UserResponse, TokenResponse
 
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Token settings are fixed at startup, so the hot paths read them as module globals
+SECRET_KEY = settings.SECRET_KEY
+ALGORITHM = "HS256"
+EXPIRE_SECONDS = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+_ALGORITHMS = [ALGORITHM]
+_ACCESS_TOKEN_EXPIRE = timedelta(seconds=EXPIRE_SECONDS)
+
+# Short claim name for the user id keeps tokens small; tokens issued before the
+# rename carry "user_id" and are still accepted until they expire
+USER_ID_CLAIM = "uid"
+_LEGACY_USER_ID_CLAIM = "user_id"
+
+# Demo users for testing - in production, this would query a database
+_DEMO_CREATED_AT = datetime.utcnow()
+_TESTUSER_RESP = UserResponse(
+    id="user_123", username="testuser", email="test@example.com", created_at=_DEMO_CREATED_AT
+)
+_DEMO_RESP = UserResponse(
+    id="user_456", username="demo", email="demo@example.com", created_at=_DEMO_CREATED_AT
+)
+
+
+def _hash(password: bytes) -> bytes:
+    """Hash a password at the configured bcrypt cost."""
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS))
+
+
+# Password hashes are computed on first use so importing the module stays cheap
+@cache
+def _testuser_hash() -> bytes:
+    return _hash(b"testpass123")
+
+
+@cache
+def _demo_hash() -> bytes:
+    return _hash(b"demopass123")
+
+
+@cache
+def _dummy_hash() -> bytes:
+    """Hash checked against for unknown usernames, at the same cost as real hashes."""
+    return _hash(b"dummy-password")
 
 
 class AuthService:
     """Service class for authentication operations."""
     
     def __init__(self):
-        self.secret_key = settings.SECRET_KEY
-        self.algorithm = "HS256"
+        # Read-only mirrors of the module constants
+        self.secret_key = SECRET_KEY
+        self.algorithm = ALGORITHM
         self.access_token_expire_minutes = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+        
+        # Verified tokens keyed by SHA-256 of the raw token string; off unless JWT_CACHE_ENABLED
+        self.token_cache_ttl = settings.JWT_CACHE_TTL
+        self._token_cache: Optional[TLRUCache] = None
+        if settings.JWT_CACHE_ENABLED and self.token_cache_ttl > 0:
+            self._token_cache = TLRUCache(maxsize=settings.JWT_CACHE_MAX, ttu=self._token_ttu)
+        self._token_cache_lock = threading.Lock()
+    
+    def _token_ttu(self, key: bytes, token_data: TokenData, now: float) -> float:
+        """Expire cache entries after the cache TTL or at token expiry, whichever is first."""
+        remaining = token_data.expires_at.timestamp() - time.time() if token_data.expires_at else 0
+        return now + min(self.token_cache_ttl, remaining)
+    
+    def get_cached_token(self, token: str) -> Optional[TokenData]:
+        """Return the token data of a recently verified token, if cached."""
+        if self._token_cache is None:
+            return None
+        
+        key = hashlib.sha256(token.encode()).digest()
+        with self._token_cache_lock:
+            return self._token_cache.get(key)
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify a plain password against its hash."""
-        return pwd_context.verify(plain_password, hashed_password)
+        return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
     
     def get_password_hash(self, password: str) -> str:
         """Generate password hash."""
-        return pwd_context.hash(password)
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode()
     
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """Create a JWT access token."""
-        to_encode = data.copy()
+        expire = datetime.now(timezone.utc) + (expires_delta or _ACCESS_TOKEN_EXPIRE)
+        return jwt.encode({**data, "exp": expire}, SECRET_KEY, algorithm=ALGORITHM)
+    
+    def verify_token(self, token: str) -> TokenData:
+        """
+        Verify and decode a JWT token.
         
-        if expires_delta:
-            expire = datetime.utcnow() + expires_delta
-        else:
-            expire = datetime.utcnow() + timedelta(minutes=self.access_token_expire_minutes)
+        With JWT_CACHE_ENABLED, successful verifications are cached for up to
+        JWT_CACHE_TTL seconds; failures are never cached.
+        """
+        token_data = self.get_cached_token(token)
+        if token_data is not None:
+            return token_data
         
-        to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
-        return encoded_jwt
+        token_data = self._decode_token(token)
+        if self._token_cache is not None:
+            key = hashlib.sha256(token.encode()).digest()
+            with self._token_cache_lock:
+                self._token_cache[key] = token_data
+        return token_data
     
-    def verify_token(self, token: str) -> TokenData:
-        """Verify and decode a JWT token."""
+    def _decode_token(self, token: str) -> TokenData:
+        """Decode a JWT token, raising a 401 HTTPException if it is invalid."""
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -53,9 +131,9 @@ class AuthService:
         )
         
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            payload = jwt.decode(token, SECRET_KEY, algorithms=_ALGORITHMS)
             username: str = payload.get("sub")
-            user_id: str = payload.get("user_id")
+            user_id: str = payload.get(USER_ID_CLAIM) or payload.get(_LEGACY_USER_ID_CLAIM)
             expires_at: datetime = datetime.fromtimestamp(payload.get("exp", 0))
             
             if username is None:
@@ -77,54 +155,35 @@ class AuthService:
         
         Note: This is a simplified implementation for demo purposes.
         In a real application, you would validate against a database.
+        The returned UserResponse is a shared template and must not be mutated.
         """
-        # Demo user for testing - in production, this would query a database
-        demo_users = {
-            "testuser": {
-                "id": "user_123",
-                "username": "testuser",
-                "email": "test@example.com",
-                "hashed_password": self.get_password_hash("testpass123"),
-                "created_at": datetime.utcnow(),
-                "is_active": True
-            },
-            "demo": {
-                "id": "user_456", 
-                "username": "demo",
-                "email": "demo@example.com",
-                "hashed_password": self.get_password_hash("demopass123"),
-                "created_at": datetime.utcnow(),
-                "is_active": True
-            }
-        }
-        
-        user_data = demo_users.get(credentials.username)
-        if not user_data:
+        username = credentials.username
+        if username == "testuser":
+            hashed, user = _testuser_hash(), _TESTUSER_RESP
+        elif username == "demo":
+            hashed, user = _demo_hash(), _DEMO_RESP
+        else:
+            # Spend the same bcrypt work as a real check so response time
+            # doesn't reveal whether the username exists
+            bcrypt.checkpw(credentials.password.encode(), _dummy_hash())
             return None
-            
-        if not self.verify_password(credentials.password, user_data["hashed_password"]):
+        
+        if not bcrypt.checkpw(credentials.password.encode(), hashed):
             return None
-            
-        return UserResponse(
-            id=user_data["id"],
-            username=user_data["username"],
-            email=user_data["email"],
-            created_at=user_data["created_at"],
-            is_active=user_data["is_active"]
-        )
+        
+        return user
     
     def create_token_response(self, user: UserResponse) -> TokenResponse:
         """Create a complete token response for a user."""
-        access_token_expires = timedelta(minutes=self.access_token_expire_minutes)
         access_token = self.create_access_token(
-            data={"sub": user.username, "user_id": user.id},
-            expires_delta=access_token_expires
+            data={"sub": user.username, USER_ID_CLAIM: user.id},
+            expires_delta=_ACCESS_TOKEN_EXPIRE
         )
         
         return TokenResponse(
             access_token=access_token,
             token_type="bearer",
-            expires_in=self.access_token_expire_minutes * 60,  # Convert to seconds
+            expires_in=EXPIRE_SECONDS,
             user=user
         )
 
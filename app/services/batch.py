@@ -0,0 +1,141 @@
+"""
+Asynchronous request batching for checklist generation.
+
+Requests already waiting in the queue are taken together, up to the
+batch size, and dispatched to the checklist generator without waiting
+for more to arrive. Each request still makes its own Groq call; the
+batch bounds how much is handed over at once, it does not combine
+prompts.
+"""
+
+import asyncio
+import logging
+from typing import List, Optional, Set, Tuple
+
+from app.models.checklist import ChecklistGenerationResponse
+from app.models.trip import TripDataResponse
+from app.services.checklist_generator import ChecklistGeneratorService
+
+logger = logging.getLogger(__name__)
+
+
+class ChecklistBatcher:
+    """
+    Collects checklist generation requests and dispatches them in batches.
+
+    Each caller awaits a future that is resolved with its own result once
+    the batch it was placed in completes. When the consumer task is not
+    running, requests are passed straight through to the generator.
+    """
+
+    def __init__(
+        self,
+        generator: ChecklistGeneratorService,
+        max_batch_size: int = 8
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            generator: Checklist generator used to process each request
+            max_batch_size: Maximum number of requests dispatched together
+        """
+        self.generator = generator
+        self.max_batch_size = max_batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._dispatches: Set[asyncio.Task] = set()
+
+    @property
+    def running(self) -> bool:
+        """Whether the consumer task is accepting requests."""
+        return self._consumer is not None and not self._consumer.done()
+
+    def start(self) -> None:
+        """Start the consumer task on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._consumer = asyncio.create_task(self._consume())
+        logger.info("Checklist batcher started (batch size %d)", self.max_batch_size)
+
+    async def stop(self) -> None:
+        """Stop the consumer task and finish any queued or in-flight requests."""
+        if self._consumer is None:
+            return
+
+        self._consumer.cancel()
+        try:
+            await self._consumer
+        except asyncio.CancelledError:
+            pass
+        self._consumer = None
+
+        # Dispatch whatever is still waiting in the queue
+        remaining = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        if remaining:
+            await self._dispatch(remaining)
+
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+
+    async def submit(self, trip_data: TripDataResponse) -> ChecklistGenerationResponse:
+        """
+        Submit a trip for checklist generation and wait for its result.
+
+        Args:
+            trip_data: Trip information to generate checklist for
+
+        Returns:
+            Generated checklist for this trip
+
+        Raises:
+            Any exception raised by the generator for this request
+        """
+        if not self.running:
+            return await self.generator.generate_checklist(trip_data)
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((trip_data, future))
+        return await future
+
+    async def _consume(self) -> None:
+        """Drain the queue into batches and dispatch them."""
+        while True:
+            batch = [await self._queue.get()]
+
+            # Take whatever is already queued; a lone request is not held back
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            # Dispatch without blocking the next batch from being taken
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(
+        self,
+        batch: List[Tuple[TripDataResponse, asyncio.Future]]
+    ) -> None:
+        """Run a batch of requests concurrently and resolve their futures."""
+        # Callers that gave up before dispatch do not get a generation run
+        batch = [(trip_data, future) for trip_data, future in batch if not future.cancelled()]
+        if not batch:
+            return
+
+        logger.debug("Dispatching checklist batch of %d requests", len(batch))
+
+        results = await asyncio.gather(
+            *(self.generator.generate_checklist(trip_data) for trip_data, _ in batch),
+            return_exceptions=True
+        )
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
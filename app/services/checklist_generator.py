@@ -5,12 +5,15 @@ This service handles the business logic for generating personalized
 trip checklists using the Groq API and AI models.
 """
 
-import json
+import heapq
 import logging
+import os
 import re
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-from uuid import uuid4
+from typing import List, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
+
+import orjson
 
 from app.models.trip import TripDataResponse, TransportType
 from app.models.checklist import (
@@ -23,6 +26,180 @@ from app.services.groq_client import GroqClient, GroqAPIError, GroqRateLimitErro
 logger = logging.getLogger(__name__)
 
 
+# Priority words the AI may use; anything else is treated as medium
+_PRIORITY_MAP = {
+    "high": PriorityLevel.HIGH,
+    "essential": PriorityLevel.HIGH,
+    "critical": PriorityLevel.HIGH,
+    "important": PriorityLevel.HIGH,
+    "low": PriorityLevel.LOW,
+    "optional": PriorityLevel.LOW,
+    "nice-to-have": PriorityLevel.LOW,
+}
+
+# Outermost JSON object in an AI response
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# Formatting instructions appended to every prompt, identical for all trips
+_PROMPT_TAIL = "\n".join([
+    "",
+    "Please provide a JSON response with the following structure:",
+    "{",
+    '  "items": [',
+    '    {',
+    '      "text": "Item description",',
+    '      "category": "Category name (e.g., Clothing, Electronics, Documents, Toiletries, etc.)",',
+    '      "priority": "high|medium|low"',
+    '    }',
+    '  ]',
+    "}",
+    "",
+    "Guidelines:",
+    "- Include 15-25 relevant items",
+    "- Categorize items logically",
+    "- Consider the destination climate and culture",
+    "- Account for the trip duration and transportation method",
+    "- Include essential items like documents, medications, etc.",
+    "- Prioritize items based on importance (high: essential, medium: recommended, low: optional)",
+    "- Make items specific and actionable",
+    "",
+    "Return only the JSON response, no additional text."
+])
+
+
+# Item templates as (text, category, priority)
+ItemTemplate = Tuple[str, str, PriorityLevel]
+
+# Base items used when AI generation fails
+_FALLBACK_ITEMS: Tuple[ItemTemplate, ...] = (
+    # Essential Documents
+    ("Passport or government-issued ID", "Documents", PriorityLevel.HIGH),
+    ("Travel insurance documents", "Documents", PriorityLevel.HIGH),
+    ("Hotel/accommodation confirmations", "Documents", PriorityLevel.HIGH),
+    ("Emergency contact information", "Documents", PriorityLevel.HIGH),
+    
+    # Clothing Essentials
+    ("Underwear (enough for trip duration + 2 extra)", "Clothing", PriorityLevel.HIGH),
+    ("Socks (enough for trip duration + 2 extra)", "Clothing", PriorityLevel.HIGH),
+    ("Weather-appropriate outerwear", "Clothing", PriorityLevel.MEDIUM),
+    ("Comfortable walking shoes", "Clothing", PriorityLevel.MEDIUM),
+    ("Sleepwear", "Clothing", PriorityLevel.MEDIUM),
+    
+    # Health & Toiletries
+    ("Prescription medications", "Health", PriorityLevel.HIGH),
+    ("Toothbrush and toothpaste", "Toiletries", PriorityLevel.HIGH),
+    ("Deodorant", "Toiletries", PriorityLevel.MEDIUM),
+    ("Shampoo and body wash", "Toiletries", PriorityLevel.MEDIUM),
+    ("Sunscreen", "Health", PriorityLevel.MEDIUM),
+    
+    # Electronics
+    ("Phone and charger", "Electronics", PriorityLevel.HIGH),
+    ("Camera or phone for photos", "Electronics", PriorityLevel.LOW),
+    ("Portable power bank", "Electronics", PriorityLevel.MEDIUM),
+    
+    # Money & Cards
+    ("Credit/debit cards", "Money", PriorityLevel.HIGH),
+    ("Cash in local currency", "Money", PriorityLevel.MEDIUM),
+    
+    # Miscellaneous
+    ("Reusable water bottle", "Miscellaneous", PriorityLevel.MEDIUM),
+    ("Travel pillow", "Comfort", PriorityLevel.LOW),
+    ("Entertainment (books, tablets, etc.)", "Entertainment", PriorityLevel.LOW),
+)
+
+# Fallback checklists are capped at this many items, dropping low priorities first
+_MAX_FALLBACK_ITEMS = 25
+_PRIORITY_RANK = {PriorityLevel.HIGH: 0, PriorityLevel.MEDIUM: 1, PriorityLevel.LOW: 2}
+
+
+def _priority_rank(item: ChecklistItemResponse) -> int:
+    """Sort key ordering items from high to low priority."""
+    return _PRIORITY_RANK[item.priority]
+
+
+# Transport bits on each template: items that only make sense by car or by plane
+_CAR_ONLY = 1
+_PLANE_ONLY = 2
+_PLANE_KEYWORDS = ("boarding", "flight", "airport")
+
+# Bits that exclude an item for each transport type
+_TRANSPORT_SKIP_MASK = {
+    TransportType.PLANE: _CAR_ONLY,
+    TransportType.CAR: _PLANE_ONLY,
+}
+
+
+def _transport_mask(text: str) -> int:
+    """Compute the transport bits for an item from its text."""
+    text = text.lower()
+    mask = _CAR_ONLY if "car" in text else 0
+    if any(word in text for word in _PLANE_KEYWORDS):
+        mask |= _PLANE_ONLY
+    return mask
+
+
+# Precomputed once, parallel to _FALLBACK_ITEMS
+_FALLBACK_MASKS: Tuple[int, ...] = tuple(_transport_mask(text) for text, _, _ in _FALLBACK_ITEMS)
+
+_PLANE_ITEMS: Tuple[ItemTemplate, ...] = (
+    ("Boarding passes (printed or mobile)", "Documents", PriorityLevel.HIGH),
+    ("Passport or ID", "Documents", PriorityLevel.HIGH),
+    ("Travel-sized toiletries (3-1-1 rule)", "Toiletries", PriorityLevel.MEDIUM),
+    ("Entertainment for flight", "Electronics", PriorityLevel.LOW),
+)
+
+_CAR_ITEMS: Tuple[ItemTemplate, ...] = (
+    ("Driver's license", "Documents", PriorityLevel.HIGH),
+    ("Car registration and insurance", "Documents", PriorityLevel.HIGH),
+    ("Phone car charger", "Electronics", PriorityLevel.MEDIUM),
+    ("Snacks for the road", "Food", PriorityLevel.LOW),
+)
+
+_LONG_TRIP_ITEMS: Tuple[ItemTemplate, ...] = (
+    ("Extra underwear and socks", "Clothing", PriorityLevel.MEDIUM),
+    ("Laundry detergent packets", "Toiletries", PriorityLevel.LOW),
+    ("First aid kit", "Health", PriorityLevel.MEDIUM),
+)
+
+
+def _new_ids(count: int) -> List[str]:
+    """Generate `count` random UUID4 strings from a single read of OS entropy."""
+    raw = os.urandom(16 * count)
+    return [str(UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * count, 16)]
+
+
+def _new_item(
+    text: str,
+    category: str,
+    priority: PriorityLevel,
+    now: datetime,
+    item_id: str
+) -> ChecklistItemResponse:
+    """
+    Create a new, unchecked, AI-generated checklist item.
+    
+    Callers pass already-typed values, so pydantic validation is skipped.
+    """
+    return ChecklistItemResponse.model_construct(
+        id=item_id,
+        text=text,
+        category=category,
+        checked=False,
+        priority=priority,
+        user_added=False,
+        created_at=now,
+        updated_at=now
+    )
+
+
+def _items_from_templates(templates: Sequence[ItemTemplate], now: datetime) -> List[ChecklistItemResponse]:
+    """Create checklist items from (text, category, priority) templates sharing one timestamp."""
+    return [
+        _new_item(text, category, priority, now, item_id)
+        for (text, category, priority), item_id in zip(templates, _new_ids(len(templates)))
+    ]
+
+
 class ChecklistGenerationError(Exception):
     """Custom exception for checklist generation errors."""
     pass
@@ -44,7 +221,6 @@ class ChecklistGeneratorService:
             groq_client: Configured Groq API client
         """
         self.groq_client = groq_client
-        self.fallback_items = self._load_fallback_items()
     
     async def generate_checklist(
         self,
@@ -72,7 +248,8 @@ class ChecklistGeneratorService:
             ai_response = await self.groq_client.generate_completion(
                 prompt=prompt,
                 max_tokens=1500,
-                temperature=0.7
+                temperature=0.7,
+                stop_at_json_end=True
             )
             
             # Parse the AI response into checklist items
@@ -85,7 +262,7 @@ class ChecklistGeneratorService:
             
             # Create the response
             checklist_id = str(uuid4())
-            response = ChecklistGenerationResponse(
+            response = ChecklistGenerationResponse.model_construct(
                 id=checklist_id,
                 items=items,
                 generated_at=datetime.utcnow(),
@@ -117,50 +294,23 @@ class ChecklistGeneratorService:
         Returns:
             Formatted prompt string
         """
-        # Build the base prompt
-        prompt_parts = [
-            "Generate a comprehensive packing checklist for a trip with the following details:",
-            f"- Destination: {trip_data.location}",
-            f"- Duration: {trip_data.days} day{'s' if trip_data.days != 1 else ''}",
-            f"- Transportation: {trip_data.transport.value}",
-            f"- Occasion/Purpose: {trip_data.occasion}"
-        ]
+        prompt = (
+            "Generate a comprehensive packing checklist for a trip with the following details:\n"
+            f"- Destination: {trip_data.location}\n"
+            f"- Duration: {trip_data.days} day{'s' if trip_data.days != 1 else ''}\n"
+            f"- Transportation: {trip_data.transport.value}\n"
+            f"- Occasion/Purpose: {trip_data.occasion}\n"
+        )
         
         # Add optional details
         if trip_data.notes:
-            prompt_parts.append(f"- Special notes: {trip_data.notes}")
+            prompt += f"- Special notes: {trip_data.notes}\n"
         
         if trip_data.preferences:
-            preferences_str = ", ".join(trip_data.preferences)
-            prompt_parts.append(f"- Preferences: {preferences_str}")
+            prompt += f"- Preferences: {', '.join(trip_data.preferences)}\n"
         
         # Add formatting instructions
-        prompt_parts.extend([
-            "",
-            "Please provide a JSON response with the following structure:",
-            "{",
-            '  "items": [',
-            '    {',
-            '      "text": "Item description",',
-            '      "category": "Category name (e.g., Clothing, Electronics, Documents, Toiletries, etc.)",',
-            '      "priority": "high|medium|low"',
-            '    }',
-            '  ]',
-            "}",
-            "",
-            "Guidelines:",
-            "- Include 15-25 relevant items",
-            "- Categorize items logically",
-            "- Consider the destination climate and culture",
-            "- Account for the trip duration and transportation method",
-            "- Include essential items like documents, medications, etc.",
-            "- Prioritize items based on importance (high: essential, medium: recommended, low: optional)",
-            "- Make items specific and actionable",
-            "",
-            "Return only the JSON response, no additional text."
-        ])
-        
-        return "\n".join(prompt_parts)
+        return prompt + _PROMPT_TAIL
     
     def _parse_ai_response(self, response: str) -> List[ChecklistItemResponse]:
         """
@@ -174,53 +324,45 @@ class ChecklistGeneratorService:
         """
         try:
             # Clean the response - remove any markdown formatting
-            cleaned_response = response.strip()
-            if cleaned_response.startswith("```json"):
-                cleaned_response = cleaned_response[7:]
-            if cleaned_response.endswith("```"):
-                cleaned_response = cleaned_response[:-3]
-            cleaned_response = cleaned_response.strip()
+            cleaned_response = response.strip().removeprefix("```json").removesuffix("```").strip()
             
             # Try to find JSON in the response
-            json_match = re.search(r'\{.*\}', cleaned_response, re.DOTALL)
+            json_match = _JSON_RE.search(cleaned_response)
             if json_match:
                 json_str = json_match.group()
             else:
                 json_str = cleaned_response
             
             # Parse JSON
-            parsed_data = json.loads(json_str)
+            parsed_data = orjson.loads(json_str)
             
             if not isinstance(parsed_data, dict) or "items" not in parsed_data:
                 logger.error("Invalid JSON structure in AI response")
                 return []
             
-            items = []
-            for item_data in parsed_data["items"]:
-                if not isinstance(item_data, dict):
-                    continue
-                
-                # Validate required fields
-                if not all(key in item_data for key in ["text", "category"]):
-                    continue
-                
-                # Create checklist item
-                item = ChecklistItemResponse(
-                    id=str(uuid4()),
-                    text=str(item_data["text"]).strip(),
-                    category=str(item_data["category"]).strip(),
-                    checked=False,
-                    priority=self._parse_priority(item_data.get("priority", "medium")),
-                    user_added=False,
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow()
+            # Validate required fields
+            valid_items = [
+                item_data for item_data in parsed_data["items"]
+                if isinstance(item_data, dict) and "text" in item_data and "category" in item_data
+            ]
+            
+            # Create checklist items sharing one timestamp
+            now = datetime.utcnow()
+            items = [
+                _new_item(
+                    str(item_data["text"]).strip(),
+                    str(item_data["category"]).strip(),
+                    self._parse_priority(item_data.get("priority", "medium")),
+                    now,
+                    item_id
                 )
-                items.append(item)
+                for item_data, item_id in zip(valid_items, _new_ids(len(valid_items)))
+            ]
             
             logger.info(f"Successfully parsed {len(items)} items from AI response")
             return items
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON from AI response: {str(e)}")
             return []
         except Exception as e:
@@ -237,14 +379,7 @@ class ChecklistGeneratorService:
         Returns:
             PriorityLevel enum value
         """
-        priority_lower = str(priority_str).lower().strip()
-        
-        if priority_lower in ["high", "essential", "critical", "important"]:
-            return PriorityLevel.HIGH
-        elif priority_lower in ["low", "optional", "nice-to-have"]:
-            return PriorityLevel.LOW
-        else:
-            return PriorityLevel.MEDIUM
+        return _PRIORITY_MAP.get(str(priority_str).lower().strip(), PriorityLevel.MEDIUM)
     
     def _generate_fallback_items(self, trip_data: TripDataResponse) -> List[ChecklistItemResponse]:
         """
@@ -258,182 +393,78 @@ class ChecklistGeneratorService:
         """
         logger.info("Generating fallback checklist items")
         
-        # Get base fallback items
-        base_items = self.fallback_items.copy()
-        
-        # Customize based on trip data
-        customized_items = []
+        now = datetime.utcnow()
         
-        for item_template in base_items:
-            # Skip items not relevant to transport type
-            if self._should_skip_item_for_transport(item_template, trip_data.transport):
-                continue
-            
-            # Create the item
-            item = ChecklistItemResponse(
-                id=str(uuid4()),
-                text=item_template["text"],
-                category=item_template["category"],
-                checked=False,
-                priority=PriorityLevel(item_template["priority"]),
-                user_added=False,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
-            )
-            customized_items.append(item)
+        # Customize base fallback items, skipping those not relevant to the transport type
+        customized_items = _items_from_templates(
+            [
+                item_template for item_template, mask in zip(_FALLBACK_ITEMS, _FALLBACK_MASKS)
+                if not self._should_skip_item_for_transport(mask, trip_data.transport)
+            ],
+            now
+        )
         
         # Add transport-specific items
-        transport_items = self._get_transport_specific_items(trip_data.transport)
+        transport_items = self._get_transport_specific_items(trip_data.transport, now)
         customized_items.extend(transport_items)
         
         # Add duration-specific items (prioritize these for long trips)
         if trip_data.days > 7:
-            duration_items = self._get_long_trip_items()
+            duration_items = self._get_long_trip_items(now)
             customized_items.extend(duration_items)
         
         # Limit to 25 items, but ensure we keep the most important ones
-        if len(customized_items) > 25:
-            # Sort by priority (high first) and keep top 25
-            priority_order = {"high": 0, "medium": 1, "low": 2}
-            customized_items.sort(key=lambda x: priority_order.get(x.priority.value, 1))
-            customized_items = customized_items[:25]
+        if len(customized_items) > _MAX_FALLBACK_ITEMS:
+            # Keep the top 25 by priority (high first); nsmallest is stable like sort
+            customized_items = heapq.nsmallest(
+                _MAX_FALLBACK_ITEMS, customized_items, key=_priority_rank
+            )
         
         return customized_items
     
-    def _should_skip_item_for_transport(self, item: Dict[str, Any], transport: TransportType) -> bool:
-        """Check if an item should be skipped based on transport type."""
-        # Skip car-specific items for air travel
-        if transport == TransportType.PLANE and "car" in item["text"].lower():
-            return True
+    def _should_skip_item_for_transport(self, mask: int, transport: TransportType) -> bool:
+        """
+        Check if an item should be skipped based on transport type.
         
-        # Skip plane-specific items for car travel
-        if transport == TransportType.CAR and any(word in item["text"].lower() for word in ["boarding", "flight", "airport"]):
-            return True
+        Car-only items are skipped for air travel and plane-only items
+        for car travel.
         
-        return False
+        Args:
+            mask: Transport bits of the item, from _transport_mask
+            transport: Transport type of the trip
+        """
+        return bool(mask & _TRANSPORT_SKIP_MASK.get(transport, 0))
     
-    def _get_transport_specific_items(self, transport: TransportType) -> List[ChecklistItemResponse]:
+    def _get_transport_specific_items(
+        self,
+        transport: TransportType,
+        now: Optional[datetime] = None
+    ) -> List[ChecklistItemResponse]:
         """Get items specific to the transport type."""
-        items = []
-        now = datetime.utcnow()
+        now = now or datetime.utcnow()
         
         if transport == TransportType.PLANE:
-            plane_items = [
-                {"text": "Boarding passes (printed or mobile)", "category": "Documents", "priority": "high"},
-                {"text": "Passport or ID", "category": "Documents", "priority": "high"},
-                {"text": "Travel-sized toiletries (3-1-1 rule)", "category": "Toiletries", "priority": "medium"},
-                {"text": "Entertainment for flight", "category": "Electronics", "priority": "low"}
-            ]
-            for item_data in plane_items:
-                items.append(ChecklistItemResponse(
-                    id=str(uuid4()),
-                    text=item_data["text"],
-                    category=item_data["category"],
-                    checked=False,
-                    priority=PriorityLevel(item_data["priority"]),
-                    user_added=False,
-                    created_at=now,
-                    updated_at=now
-                ))
+            return _items_from_templates(_PLANE_ITEMS, now)
         
         elif transport == TransportType.CAR:
-            car_items = [
-                {"text": "Driver's license", "category": "Documents", "priority": "high"},
-                {"text": "Car registration and insurance", "category": "Documents", "priority": "high"},
-                {"text": "Phone car charger", "category": "Electronics", "priority": "medium"},
-                {"text": "Snacks for the road", "category": "Food", "priority": "low"}
-            ]
-            for item_data in car_items:
-                items.append(ChecklistItemResponse(
-                    id=str(uuid4()),
-                    text=item_data["text"],
-                    category=item_data["category"],
-                    checked=False,
-                    priority=PriorityLevel(item_data["priority"]),
-                    user_added=False,
-                    created_at=now,
-                    updated_at=now
-                ))
+            return _items_from_templates(_CAR_ITEMS, now)
         
-        return items
+        return []
     
-    def _get_long_trip_items(self) -> List[ChecklistItemResponse]:
+    def _get_long_trip_items(self, now: Optional[datetime] = None) -> List[ChecklistItemResponse]:
         """Get additional items for longer trips."""
-        now = datetime.utcnow()
-        long_trip_items = [
-            {"text": "Extra underwear and socks", "category": "Clothing", "priority": "medium"},
-            {"text": "Laundry detergent packets", "category": "Toiletries", "priority": "low"},
-            {"text": "First aid kit", "category": "Health", "priority": "medium"}
-        ]
-        
-        items = []
-        for item_data in long_trip_items:
-            items.append(ChecklistItemResponse(
-                id=str(uuid4()),
-                text=item_data["text"],
-                category=item_data["category"],
-                checked=False,
-                priority=PriorityLevel(item_data["priority"]),
-                user_added=False,
-                created_at=now,
-                updated_at=now
-            ))
-        
-        return items
+        return _items_from_templates(_LONG_TRIP_ITEMS, now or datetime.utcnow())
     
     def _create_fallback_response(self, trip_data: TripDataResponse) -> ChecklistGenerationResponse:
         """Create a fallback response when AI generation fails."""
         items = self._generate_fallback_items(trip_data)
         
-        return ChecklistGenerationResponse(
+        return ChecklistGenerationResponse.model_construct(
             id=str(uuid4()),
             items=items,
             generated_at=datetime.utcnow(),
             trip_data=trip_data
         )
-    
-    def _load_fallback_items(self) -> List[Dict[str, Any]]:
-        """
-        Load fallback checklist items for when AI generation fails.
-        
-        Returns:
-            List of fallback item templates
-        """
-        return [
-            # Essential Documents
-            {"text": "Passport or government-issued ID", "category": "Documents", "priority": "high"},
-            {"text": "Travel insurance documents", "category": "Documents", "priority": "high"},
-            {"text": "Hotel/accommodation confirmations", "category": "Documents", "priority": "high"},
-            {"text": "Emergency contact information", "category": "Documents", "priority": "high"},
-            
-            # Clothing Essentials
-            {"text": "Underwear (enough for trip duration + 2 extra)", "category": "Clothing", "priority": "high"},
-            {"text": "Socks (enough for trip duration + 2 extra)", "category": "Clothing", "priority": "high"},
-            {"text": "Weather-appropriate outerwear", "category": "Clothing", "priority": "medium"},
-            {"text": "Comfortable walking shoes", "category": "Clothing", "priority": "medium"},
-            {"text": "Sleepwear", "category": "Clothing", "priority": "medium"},
-            
-            # Health & Toiletries
-            {"text": "Prescription medications", "category": "Health", "priority": "high"},
-            {"text": "Toothbrush and toothpaste", "category": "Toiletries", "priority": "high"},
-            {"text": "Deodorant", "category": "Toiletries", "priority": "medium"},
-            {"text": "Shampoo and body wash", "category": "Toiletries", "priority": "medium"},
-            {"text": "Sunscreen", "category": "Health", "priority": "medium"},
-            
-            # Electronics
-            {"text": "Phone and charger", "category": "Electronics", "priority": "high"},
-            {"text": "Camera or phone for photos", "category": "Electronics", "priority": "low"},
-            {"text": "Portable power bank", "category": "Electronics", "priority": "medium"},
-            
-            # Money & Cards
-            {"text": "Credit/debit cards", "category": "Money", "priority": "high"},
-            {"text": "Cash in local currency", "category": "Money", "priority": "medium"},
-            
-            # Miscellaneous
-            {"text": "Reusable water bottle", "category": "Miscellaneous", "priority": "medium"},
-            {"text": "Travel pillow", "category": "Comfort", "priority": "low"},
-            {"text": "Entertainment (books, tablets, etc.)", "category": "Entertainment", "priority": "low"}
-        ]
 
 
 # Global instance for dependency injection
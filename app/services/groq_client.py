@@ -6,13 +6,20 @@ personalized trip checklists using AI models.
 """
 
 import logging
+import time
 from typing import Optional, Dict, Any, List
-from groq import Groq
-from groq.types.chat import ChatCompletion
+import httpx
+from groq import AsyncGroq
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# How long (seconds) an API key validation result is reused by get_model_info
+API_KEY_CHECK_TTL = 300
+
+# How long (seconds) idle pooled connections to the Groq API are kept open
+KEEPALIVE_EXPIRY = 300
+
 
 class GroqAPIError(Exception):
     """Custom exception for Groq API related errors."""
@@ -24,6 +31,48 @@ class GroqRateLimitError(GroqAPIError):
     pass
 
 
+class _JsonObjectScanner:
+    """
+    Finds the end of the first top-level JSON object in streamed text.
+    
+    Tracks brace depth across chunks, ignoring braces inside strings.
+    """
+    
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, text: str) -> int:
+        """
+        Scan the next chunk of text.
+        
+        Args:
+            text: Next chunk of streamed content
+            
+        Returns:
+            Index just past the object's closing brace, or -1 if it has not closed yet
+        """
+        for index, char in enumerate(text):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                # Quotes only matter once we are inside the object
+                self.in_string = self.depth > 0
+            elif char == "{":
+                self.depth += 1
+            elif char == "}" and self.depth:
+                self.depth -= 1
+                if not self.depth:
+                    return index + 1
+        return -1
+
+
 class GroqClient:
     """
     Client for interacting with Groq API to generate AI-powered checklists.
@@ -46,23 +95,52 @@ class GroqClient:
         if not self.api_key:
             raise GroqAPIError("Groq API key is required but not provided")
         
-        self.client = Groq(api_key=self.api_key)
+        self._open()
+        
+        # Cached result of the last API key validation
+        self._api_key_valid: Optional[bool] = None
+        self._api_key_checked_at: float = 0.0
         logger.info(f"Groq client initialized with model: {self.model}")
     
+    def _open(self) -> None:
+        """Create the pooled HTTP client and the Groq SDK client bound to it."""
+        # Explicit keep-alive pool so bursts reuse warm TLS connections
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.GROQ_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GROQ_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY
+            ),
+            timeout=settings.GROQ_TIMEOUT,
+            http2=settings.GROQ_HTTP2
+        )
+        self.client = AsyncGroq(api_key=self.api_key, http_client=self.http_client)
+    
+    def _ensure_open(self) -> None:
+        """Recreate the clients if an earlier application shutdown closed the pool."""
+        if self.http_client.is_closed:
+            self._open()
+    
     async def generate_completion(
         self,
         prompt: str,
         max_tokens: int = 1000,
         temperature: float = 0.7,
+        stop_at_json_end: bool = False,
         **kwargs
     ) -> str:
         """
         Generate a completion using the Groq API.
         
+        The response is streamed. With stop_at_json_end, the stream is closed
+        as soon as the first top-level JSON object in the output is complete,
+        without waiting for the rest of the generation.
+        
         Args:
             prompt: The input prompt for the AI model
             max_tokens: Maximum number of tokens to generate
             temperature: Sampling temperature (0.0 to 1.0)
+            stop_at_json_end: Return once the first JSON object has closed
             **kwargs: Additional parameters for the API call
             
         Returns:
@@ -75,7 +153,8 @@ class GroqClient:
         try:
             logger.debug(f"Generating completion with prompt length: {len(prompt)}")
             
-            response: ChatCompletion = self.client.chat.completions.create(
+            self._ensure_open()
+            stream = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {
@@ -85,13 +164,35 @@ class GroqClient:
                 ],
                 max_tokens=max_tokens,
                 temperature=temperature,
+                stream=True,
                 **kwargs
             )
             
-            if not response.choices:
+            parts: List[str] = []
+            has_choices = False
+            scanner = _JsonObjectScanner() if stop_at_json_end else None
+            try:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    has_choices = True
+                    text = chunk.choices[0].delta.content
+                    if not text:
+                        continue
+                    
+                    if scanner is not None:
+                        end = scanner.feed(text)
+                        if end >= 0:
+                            parts.append(text[:end])
+                            break
+                    parts.append(text)
+            finally:
+                await stream.close()
+            
+            if not has_choices:
                 raise GroqAPIError("No response choices returned from Groq API")
             
-            content = response.choices[0].message.content
+            content = "".join(parts)
             if not content:
                 raise GroqAPIError("Empty content returned from Groq API")
             
@@ -115,26 +216,47 @@ class GroqClient:
             logger.error(f"Groq API error: {str(e)}")
             raise GroqAPIError(f"Failed to generate completion: {str(e)}")
     
-    def validate_api_key(self) -> bool:
+    async def close(self) -> None:
+        """Close the pooled HTTP connections (called on application shutdown; reopened on next use)."""
+        await self.http_client.aclose()
+    
+    async def validate_api_key(self) -> bool:
         """
         Validate that the API key is properly configured and working.
         
+        Uses the models listing endpoint, which needs a valid key but
+        consumes no completion tokens.
+        
         Returns:
             True if API key is valid, False otherwise
         """
         try:
-            # Make a simple test request to validate the API key
-            test_response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": "Hello"}],
-                max_tokens=5
-            )
-            return bool(test_response.choices)
+            self._ensure_open()
+            models = await self.client.models.list()
+            valid = bool(models.data)
         except Exception as e:
             logger.error(f"API key validation failed: {str(e)}")
-            return False
+            valid = False
+        
+        self._api_key_valid = valid
+        self._api_key_checked_at = time.monotonic()
+        return valid
+    
+    async def is_api_key_valid(self) -> bool:
+        """
+        Return whether the API key is valid, revalidating at most every API_KEY_CHECK_TTL seconds.
+        
+        Returns:
+            True if API key is valid, False otherwise
+        """
+        if (
+            self._api_key_valid is None
+            or time.monotonic() - self._api_key_checked_at > API_KEY_CHECK_TTL
+        ):
+            return await self.validate_api_key()
+        return self._api_key_valid
     
-    def get_model_info(self) -> Dict[str, Any]:
+    async def get_model_info(self) -> Dict[str, Any]:
         """
         Get information about the current model configuration.
         
@@ -144,7 +266,7 @@ class GroqClient:
         return {
             "model": self.model,
             "api_key_configured": bool(self.api_key),
-            "api_key_valid": self.validate_api_key() if self.api_key else False
+            "api_key_valid": await self.is_api_key_valid() if self.api_key else False
         }
 
 
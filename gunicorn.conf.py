@@ -5,11 +5,17 @@ import multiprocessing
 import os
 
 # Server socket
-bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+# A unix socket skips the TCP stack when a local reverse proxy fronts the app
+if os.getenv('UDS_PATH'):
+    bind = f"unix:{os.getenv('UDS_PATH')}"
+else:
+    bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
 backlog = 2048
 
 # Worker processes
 workers = int(os.getenv('WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# UvicornWorker picks uvloop and httptools automatically when installed
+# (both are pinned in requirements.txt); check the "Event loop" startup log line
 worker_class = "uvicorn.workers.UvicornWorker"
 worker_connections = 1000
 max_requests = 1000
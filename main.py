@@ -1,18 +1,23 @@
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+from functools import lru_cache
 import uvicorn
+import anyio.to_thread
+import orjson
 import asyncio
+import os
 import time
-from typing import Callable
 
 from app.api.routes import router as api_router
 from app.core.config import settings
-from app.core.logging_config import setup_logging, StructuredLogger
-from app.core.rate_limiter import rate_limit_middleware, cleanup_rate_limiter
-from app.core.security import security_headers_middleware, request_size_validator
-from app.core.health import get_health_status
+from app.core.logging_config import setup_logging, StructuredLogger, RequestLoggingMiddleware
+from app.core.rate_limiter import RateLimitMiddleware
+from app.core.security import SecurityHeadersMiddleware, RequestSizeMiddleware
+from app.core.health import get_cached_health_status, close_http_client, LivenessFastPathMiddleware
+from app.services import checklist_batcher, groq_client
 
 # Setup logging first
 setup_logging()
@@ -25,23 +30,22 @@ async def lifespan(app: FastAPI):
     logger.logger.info(f"Starting up AI Trip Checklist API v{settings.VERSION}")
     logger.logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.logger.info(f"Debug mode: {settings.DEBUG}")
+    logger.logger.info(f"Event loop: {type(asyncio.get_running_loop()).__module__}")
+    
+    # Size the threadpool used for blocking work (e.g. JWT verification, bcrypt)
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = max(limiter.total_tokens, (os.cpu_count() or 1) * 2)
     
     # Start background tasks
-    cleanup_task = None
-    if settings.is_production:
-        cleanup_task = asyncio.create_task(cleanup_rate_limiter())
-        logger.logger.info("Started rate limiter cleanup task")
+    checklist_batcher.start()
     
     yield
     
     # Shutdown
     logger.logger.info("Shutting down AI Trip Checklist API...")
-    if cleanup_task:
-        cleanup_task.cancel()
-        try:
-            await cleanup_task
-        except asyncio.CancelledError:
-            pass
+    await checklist_batcher.stop()
+    await groq_client.close()
+    await close_http_client()
 
 
 # Create FastAPI app with production settings
@@ -50,6 +54,7 @@ app_kwargs = {
     "description": "Backend API for generating AI-powered travel packing checklists",
     "version": settings.VERSION,
     "lifespan": lifespan,
+    "default_response_class": ORJSONResponse,
 }
 
 # In production, disable docs and redoc for security
@@ -64,42 +69,40 @@ app = FastAPI(**app_kwargs)
 
 
 # Add middleware in correct order (last added = first executed)
-# Note: These are function-based middleware, not class-based
+# Note: These are pure ASGI middleware, so no per-request task is spawned
 
 # Security headers middleware
-@app.middleware("http")
-async def add_security_headers(request: Request, call_next: Callable):
-    return await security_headers_middleware(request, call_next)
+app.add_middleware(SecurityHeadersMiddleware)
 
-# Request size validation middleware  
-@app.middleware("http")
-async def validate_request_size(request: Request, call_next: Callable):
-    return await request_size_validator(request, call_next)
+# Request size validation middleware
+app.add_middleware(RequestSizeMiddleware)
 
 # Rate limiting middleware (only in production)
 if settings.is_production:
-    @app.middleware("http")
-    async def apply_rate_limiting(request: Request, call_next: Callable):
-        return await rate_limit_middleware(request, call_next)
+    app.add_middleware(RateLimitMiddleware)
 
 # Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next: Callable):
-    start_time = time.time()
-    
-    # Process request
-    response = await call_next(request)
-    
-    # Log request with structured logging
-    duration = time.time() - start_time
-    logger.log_request(
-        method=request.method,
-        path=request.url.path,
-        status_code=response.status_code,
-        duration=duration
-    )
-    
-    return response
+app.add_middleware(RequestLoggingMiddleware, logger=logger)
+
+
+# Fixed error bodies for production, where no request-specific details are exposed
+_INTERNAL_ERROR_BODY = orjson.dumps({
+    "error": "INTERNAL_SERVER_ERROR",
+    "message": "An unexpected error occurred",
+    "code": 500,
+    "details": None
+})
+
+
+@lru_cache(maxsize=None)
+def _production_server_error_body(status_code: int) -> bytes:
+    """Serialized body for a 5xx HTTPException in production, built once per status code"""
+    return orjson.dumps({
+        "error": "HTTP_ERROR",
+        "message": "Internal server error",
+        "code": status_code,
+        "path": None
+    })
 
 
 # Global exception handlers
@@ -108,15 +111,18 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     logger.logger.error(f"HTTP Exception: {exc.status_code} - {exc.detail} - Path: {request.url.path}")
     
     # Don't expose internal details in production
-    message = exc.detail
     if settings.is_production and exc.status_code >= 500:
-        message = "Internal server error"
+        return Response(
+            content=_production_server_error_body(exc.status_code),
+            status_code=exc.status_code,
+            media_type="application/json"
+        )
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": "HTTP_ERROR",
-            "message": message,
+            "message": exc.detail,
             "code": exc.status_code,
             "path": str(request.url.path) if settings.is_development else None
         }
@@ -125,73 +131,83 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
-    logger.logger.error(f"Unexpected error: {str(exc)} - Path: {request.url.path}", exc_info=True)
+    # The traceback is rendered by the logging queue listener, not on this request path
+    error = str(exc) if settings.is_development else f"{type(exc).__name__}: {str(exc)[:200]}"
+    logger.logger.error(f"Unexpected error: {error} - Path: {request.url.path}", exc_info=exc)
     
     # Don't expose internal error details in production
-    message = "An unexpected error occurred"
-    details = None
-    
-    if settings.is_development:
-        message = str(exc)
-        details = {
-            "type": type(exc).__name__,
-            "path": str(request.url.path)
-        }
+    if not settings.is_development:
+        return Response(content=_INTERNAL_ERROR_BODY, status_code=500, media_type="application/json")
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "INTERNAL_SERVER_ERROR",
-            "message": message,
+            "message": str(exc),
             "code": 500,
-            "details": details
+            "details": {
+                "type": type(exc).__name__,
+                "path": str(request.url.path)
+            }
         }
     )
 
+# Compress JSON responses of 1 KB or more; added before CORS so CORS stays outermost
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Configure CORS with production-safe settings
+CORS_ALLOW_METHODS = ("GET", "POST", "PUT", "DELETE", "OPTIONS")
+CORS_ALLOW_HEADERS = ("*",) if settings.is_development else (
+    "accept",
+    "accept-language",
+    "content-language",
+    "content-type",
+    "authorization",
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.get_cors_origins(),
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["*"] if settings.is_development else [
-        "Accept",
-        "Accept-Language", 
-        "Content-Language",
-        "Content-Type",
-        "Authorization"
-    ],
+    allow_methods=CORS_ALLOW_METHODS,
+    allow_headers=CORS_ALLOW_HEADERS,
     max_age=600,  # Cache preflight requests for 10 minutes
 )
 
+# Answer liveness probes before any other middleware runs
+app.add_middleware(LivenessFastPathMiddleware)
+
 # Include API routes
-app.include_router(api_router, prefix="/api/v1")
+app.include_router(api_router, prefix="/api/v1", default_response_class=ORJSONResponse)
+
+
+_ROOT_BODY = orjson.dumps({"message": "AI Trip Checklist API is running"})
 
 
 @app.get("/")
 async def root():
-    return {"message": "AI Trip Checklist API is running"}
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @app.get("/health")
 async def health_check():
     """Comprehensive health check endpoint"""
-    return await get_health_status()
+    return await get_cached_health_status()
 
 
 @app.get("/health/live")
 async def liveness_check():
-    """Simple liveness check for container orchestration"""
+    """Simple liveness check for container orchestration (normally answered by LivenessFastPathMiddleware)"""
     return {"status": "alive", "timestamp": time.time()}
 
 
 @app.get("/health/ready")
 async def readiness_check():
     """Readiness check for container orchestration"""
-    health_status = await get_health_status()
+    health_status = await get_cached_health_status()
     
     if health_status["status"] == "unhealthy":
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=503,
             content={"status": "not_ready", "details": health_status}
         )
@@ -200,13 +216,23 @@ async def readiness_check():
 
 
 if __name__ == "__main__":
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        # uvloop is not available on Windows
+        loop = "asyncio"
+    
     # Development server configuration
     uvicorn.run(
         "main:app",
         host=settings.HOST,
         port=settings.PORT,
+        uds=settings.UDS_PATH,
         reload=settings.is_development,
         log_level=settings.LOG_LEVEL.lower(),
         access_log=settings.is_development,
         workers=1,  # Single worker for development
+        loop=loop,
+        http="httptools",
     )
\ No newline at end of file
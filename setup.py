@@ -5,18 +5,23 @@ setup(
     version="1.0.0",
     description="Backend API for AI Trip Checklist App",
     packages=find_packages(),
-    python_requires=">=3.8",
+    python_requires=">=3.10",
     install_requires=[
-        "fastapi==0.104.1",
+        "fastapi==0.115.6",
         "uvicorn[standard]==0.24.0",
-        "pydantic==2.5.0",
-        "pydantic-settings==2.1.0",
-        "python-jose[cryptography]==3.3.0",
-        "passlib[bcrypt]==1.7.4",
+        "uvloop>=0.19; sys_platform != 'win32'",
+        "httptools>=0.6",
+        "pydantic==2.10.4",
+        "pydantic-settings==2.7.1",
+        "PyJWT==2.8.0",
+        "bcrypt==4.0.1",
         "python-multipart==0.0.6",
         "groq==0.4.1",
         "httpx==0.25.2",
+        "cachetools==5.3.2",
+        "orjson==3.9.10",
         "pytest==7.4.3",
         "pytest-asyncio==0.21.1",
+        "pytest-xdist==3.5.0",
     ],
 )
\ No newline at end of file
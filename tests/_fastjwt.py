@@ -0,0 +1,34 @@
+"""
+Minimal HS256 signer for test tokens with known claims.
+
+The HMAC key is prepared once and copied per token, so fixtures avoid
+the per-call key setup of jwt.encode. Tokens are standard compact JWTs
+that the app verifies like any other.
+"""
+import base64
+import hashlib
+import hmac
+import json
+
+from app.services.auth import SECRET_KEY
+
+_HMAC = hmac.new(SECRET_KEY.encode(), digestmod=hashlib.sha256)
+
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _compact_json(obj: dict) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+_HEADER = _b64url(_compact_json({"alg": "HS256", "typ": "JWT"}))
+
+
+def sign(claims: dict) -> str:
+    """Return an HS256 token for the given claims."""
+    message = _HEADER + b"." + _b64url(_compact_json(claims))
+    mac = _HMAC.copy()
+    mac.update(message)
+    return (message + b"." + _b64url(mac.digest())).decode()
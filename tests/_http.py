@@ -0,0 +1,20 @@
+"""
+orjson-backed helpers for exercising the API in tests.
+"""
+import orjson
+from fastapi.testclient import TestClient
+
+
+class ORJSONTestClient(TestClient):
+    """TestClient that encodes ``json=`` request bodies with orjson."""
+
+    def post(self, url, *, json=None, headers=None, **kwargs):
+        if json is not None:
+            kwargs["content"] = orjson.dumps(json)
+            headers = {**(headers or {}), "Content-Type": "application/json"}
+        return super().post(url, headers=headers, **kwargs)
+
+
+def J(response):
+    """Decode a JSON response body with orjson."""
+    return orjson.loads(response.content)
@@ -0,0 +1,61 @@
+"""
+Shared pytest fixtures for the test suite.
+
+Fixtures only hold in-process state, so under pytest-xdist every worker
+builds its own session-scoped copies. Run the parallel-safe tests with
+``pytest -n auto -m "not serial"`` and the rest with ``pytest -m serial``.
+"""
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from main import app
+from app.core.config import settings
+from app.services import auth
+from tests._http import ORJSONTestClient
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "serial: test must not run in parallel with other tests")
+    config.addinivalue_line("markers", "integration: test exercises several components together")
+
+
+# Seed user hashes are cached on first use, so they are rebuilt at the test cost
+_SEED_HASHES = (auth._testuser_hash, auth._demo_hash, auth._dummy_hash)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_bcrypt():
+    """Hash passwords at bcrypt's minimum cost factor for the whole session."""
+    monkeypatch = pytest.MonkeyPatch()
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    for seed_hash in _SEED_HASHES:
+        seed_hash.cache_clear()
+    yield
+    monkeypatch.undo()
+    for seed_hash in _SEED_HASHES:
+        seed_hash.cache_clear()
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Test client shared by the whole session, so the app lifespan runs once."""
+    with ORJSONTestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """One event loop for the session, so async fixtures can be session-scoped."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def aclient():
+    """Async client calling the app in-process, without TestClient's thread portal."""
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+        yield c
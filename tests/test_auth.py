@@ -1,17 +1,48 @@
 """
 Tests for authentication system.
 """
+import time
+
 import pytest
-from fastapi.testclient import TestClient
+from unittest.mock import patch
+from fastapi import HTTPException
 from datetime import datetime, timedelta
-from jose import jwt
+import jwt
+from cachetools import TLRUCache
 
-from main import app
-from app.services.auth import auth_service
+from app.core.auth import _verify_cached
+from app.services.auth import AuthService, auth_service, EXPIRE_SECONDS, USER_ID_CLAIM
 from app.models.auth import UserCredentials, TokenData
+from tests import _fastjwt
+from tests._http import J
+
+
+# Signed once at import; an exp at the epoch is always in the past
+EXPIRED_TOKEN = _fastjwt.sign({"sub": "testuser", USER_ID_CLAIM: "123", "exp": 0})
+
+
+@pytest.fixture
+def token_cache(monkeypatch):
+    """Enable the verified-token cache, which is off by default."""
+    monkeypatch.setattr(auth_service, "token_cache_ttl", 5)
+    monkeypatch.setattr(auth_service, "_token_cache", TLRUCache(maxsize=16, ttu=auth_service._token_ttu))
+
 
+def _seed_user_token(username: str, user_id: str) -> str:
+    """Sign an access token with the same claims /auth/login issues for a seed user."""
+    return _fastjwt.sign({"sub": username, USER_ID_CLAIM: user_id, "exp": int(time.time()) + EXPIRE_SECONDS})
 
-client = TestClient(app)
+
+@pytest.fixture(scope="module")
+def testuser_token():
+    """Access token for the test user, signed once per module."""
+    return _seed_user_token("testuser", "user_123")
+
+
+@pytest.fixture(scope="module")
+def demo_token():
+    """Access token for the demo user, signed once per module."""
+    return _seed_user_token("demo", "user_456")
 
 
 class TestAuthService:
@@ -58,7 +89,7 @@ class TestAuthService:
     
     def test_verify_token_valid(self):
         """Test token verification with valid token."""
-        data = {"sub": "testuser", "user_id": "123"}
+        data = {"sub": "testuser", "uid": "123"}
         token = auth_service.create_access_token(data)
         
         token_data = auth_service.verify_token(token)
@@ -68,11 +99,30 @@ class TestAuthService:
         assert token_data.user_id == "123"
         assert token_data.expires_at is not None
     
+    def test_verify_token_accepts_legacy_user_id_claim(self):
+        """Test that tokens issued with the old user_id claim still verify."""
+        token = auth_service.create_access_token({"sub": "testuser", "user_id": "123"})
+        
+        token_data = auth_service.verify_token(token)
+        
+        assert token_data.user_id == "123"
+    
     def test_verify_token_invalid(self):
         """Test token verification with invalid token."""
         with pytest.raises(Exception):  # Should raise HTTPException
             auth_service.verify_token("invalid_token")
     
+    def test_verify_token_caches_decoded_token(self, token_cache):
+        """Test that repeated verification of a token decodes it only once."""
+        token = auth_service.create_access_token({"sub": "testuser", "user_id": "123"}, timedelta(minutes=5))
+        
+        with patch("app.services.auth.jwt.decode", wraps=jwt.decode) as mock_decode:
+            first = auth_service.verify_token(token)
+            second = auth_service.verify_token(token)
+        
+        assert first == second
+        mock_decode.assert_called_once()
+    
     def test_authenticate_user_valid(self):
         """Test user authentication with valid credentials."""
         credentials = UserCredentials(username="testuser", password="testpass123")
@@ -108,12 +158,16 @@ class TestAuthService:
         assert token_response.token_type == "bearer"
         assert token_response.expires_in > 0
         assert token_response.user.username == "testuser"
+        
+        payload = jwt.decode(token_response.access_token, auth_service.secret_key, algorithms=[auth_service.algorithm])
+        assert set(payload) == {"sub", "uid", "exp"}
+        assert payload["uid"] == "user_123"
 
 
 class TestAuthEndpoints:
     """Test authentication endpoints."""
     
-    def test_login_valid_credentials(self):
+    def test_login_valid_credentials(self, client):
         """Test login with valid credentials."""
         response = client.post(
             "/api/v1/auth/login",
@@ -121,14 +175,14 @@ class TestAuthEndpoints:
         )
         
         assert response.status_code == 200
-        data = response.json()
+        data = J(response)
         
         assert "access_token" in data
         assert data["token_type"] == "bearer"
         assert "expires_in" in data
         assert data["user"]["username"] == "testuser"
     
-    def test_login_invalid_credentials(self):
+    def test_login_invalid_credentials(self, client):
         """Test login with invalid credentials."""
         response = client.post(
             "/api/v1/auth/login",
@@ -136,10 +190,10 @@ class TestAuthEndpoints:
         )
         
         assert response.status_code == 401
-        data = response.json()
+        data = J(response)
         assert "error" in data
     
-    def test_login_nonexistent_user(self):
+    def test_login_nonexistent_user(self, client):
         """Test login with nonexistent user."""
         response = client.post(
             "/api/v1/auth/login",
@@ -148,7 +202,7 @@ class TestAuthEndpoints:
         
         assert response.status_code == 401
     
-    def test_login_validation_error(self):
+    def test_login_validation_error(self, client):
         """Test login with validation errors."""
         # Missing password
         response = client.post(
@@ -158,28 +212,20 @@ class TestAuthEndpoints:
         
         assert response.status_code == 422
     
-    def test_get_current_user_info_valid_token(self):
+    def test_get_current_user_info_valid_token(self, client, testuser_token):
         """Test getting current user info with valid token."""
-        # First login to get token
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"username": "testuser", "password": "testpass123"}
-        )
-        token = login_response.json()["access_token"]
-        
-        # Use token to access protected endpoint
         response = client.get(
             "/api/v1/auth/me",
-            headers={"Authorization": f"Bearer {token}"}
+            headers={"Authorization": f"Bearer {testuser_token}"}
         )
         
         assert response.status_code == 200
-        data = response.json()
+        data = J(response)
         assert data["username"] == "testuser"
         assert "user_id" in data
         assert "expires_at" in data
     
-    def test_get_current_user_info_invalid_token(self):
+    def test_get_current_user_info_invalid_token(self, client):
         """Test getting current user info with invalid token."""
         response = client.get(
             "/api/v1/auth/me",
@@ -188,87 +234,63 @@ class TestAuthEndpoints:
         
         assert response.status_code == 401
     
-    def test_get_current_user_info_no_token(self):
+    def test_get_current_user_info_no_token(self, client):
         """Test getting current user info without token."""
         response = client.get("/api/v1/auth/me")
         
         assert response.status_code == 403  # No token provided
     
-    def test_protected_endpoint_with_token(self):
+    def test_protected_endpoint_with_token(self, client, demo_token):
         """Test protected endpoint with valid token."""
-        # First login to get token
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"username": "demo", "password": "demopass123"}
-        )
-        token = login_response.json()["access_token"]
-        
-        # Access protected endpoint
         response = client.get(
             "/api/v1/protected",
-            headers={"Authorization": f"Bearer {token}"}
+            headers={"Authorization": f"Bearer {demo_token}"}
         )
         
         assert response.status_code == 200
-        data = response.json()
+        data = J(response)
         assert "Hello demo!" in data["message"]
         assert data["access_granted"] is True
     
-    def test_protected_endpoint_without_token(self):
+    def test_protected_endpoint_without_token(self, client):
         """Test protected endpoint without token."""
         response = client.get("/api/v1/protected")
         
         assert response.status_code == 403
     
-    def test_logout_endpoint(self):
+    def test_logout_endpoint(self, client):
         """Test logout endpoint."""
         response = client.post("/api/v1/auth/logout")
         
         assert response.status_code == 200
-        data = response.json()
+        data = J(response)
         assert "Logout successful" in data["message"]
     
-    def test_generate_checklist_requires_auth(self):
-        """Test that generate checklist endpoint now requires authentication."""
-        response = client.post("/api/v1/generate-checklist")
-        
-        assert response.status_code == 403  # No token provided
-        
-        # Test with valid token
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"username": "testuser", "password": "testpass123"}
-        )
-        token = login_response.json()["access_token"]
-        
+    def test_generate_checklist_requires_auth(self, client):
+        """Test that generate checklist endpoint requires authentication."""
         response = client.post(
             "/api/v1/generate-checklist",
-            headers={"Authorization": f"Bearer {token}"}
+            json={"trip_data": {"location": "Tokyo", "days": 3, "transport": "train", "occasion": "business"}}
         )
         
-        assert response.status_code == 200
-        data = response.json()
-        assert data["user"] == "testuser"
+        # A valid body is still rejected without a token
+        assert response.status_code == 403
+        assert "Not authenticated" in J(response)["message"]
 
 
 class TestAuthMiddleware:
     """Test authentication middleware functionality."""
     
-    def test_token_expiry_handling(self):
+    def test_token_expiry_handling(self, client):
         """Test handling of expired tokens."""
-        # Create a token that expires immediately
-        data = {"sub": "testuser", "user_id": "123"}
-        expires_delta = timedelta(seconds=-1)  # Already expired
-        expired_token = auth_service.create_access_token(data, expires_delta)
-        
         response = client.get(
             "/api/v1/auth/me",
-            headers={"Authorization": f"Bearer {expired_token}"}
+            headers={"Authorization": f"Bearer {EXPIRED_TOKEN}"}
         )
         
         assert response.status_code == 401
     
-    def test_malformed_token(self):
+    def test_malformed_token(self, client):
         """Test handling of malformed tokens."""
         response = client.get(
             "/api/v1/auth/me",
@@ -277,17 +299,42 @@ class TestAuthMiddleware:
         
         assert response.status_code == 401
     
-    def test_missing_bearer_prefix(self):
+    def test_missing_bearer_prefix(self, client, testuser_token):
         """Test handling of tokens without Bearer prefix."""
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"username": "testuser", "password": "testpass123"}
-        )
-        token = login_response.json()["access_token"]
-        
         response = client.get(
             "/api/v1/auth/me",
-            headers={"Authorization": token}  # Missing "Bearer " prefix
+            headers={"Authorization": testuser_token}  # Missing "Bearer " prefix
         )
         
-        assert response.status_code == 403
\ No newline at end of file
+        assert response.status_code == 403
+
+
+class TestTokenCache:
+    """Test caching of verified tokens in the auth dependencies."""
+    
+    def test_token_cache_is_off_by_default(self):
+        """Test that verified tokens are not reused unless a deployment opts in."""
+        assert AuthService()._token_cache is None
+    
+    @pytest.mark.asyncio
+    async def test_verified_token_is_cached(self, token_cache):
+        """Test that a valid token is only decoded once."""
+        token = auth_service.create_access_token({"sub": "testuser", "user_id": "123"})
+        
+        with patch.object(auth_service, "verify_token", wraps=auth_service.verify_token) as mock_verify:
+            first = await _verify_cached(token)
+            second = await _verify_cached(token)
+        
+        assert first == second
+        assert first.username == "testuser"
+        mock_verify.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_invalid_token_is_not_cached(self, token_cache):
+        """Test that failed verifications are not cached."""
+        with patch.object(auth_service, "verify_token", wraps=auth_service.verify_token) as mock_verify:
+            for _ in range(2):
+                with pytest.raises(HTTPException):
+                    await _verify_cached("invalid_token")
+        
+        assert mock_verify.call_count == 2
\ No newline at end of file
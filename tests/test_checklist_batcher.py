@@ -0,0 +1,118 @@
+"""
+Unit tests for the checklist generation batcher.
+
+Tests cover pass-through behaviour, batching of concurrent requests,
+shutdown, skipping cancelled requests and per-request error propagation.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+from app.models.trip import TripDataResponse, TransportType
+from app.services.batch import ChecklistBatcher
+
+
+def make_trip(location: str) -> TripDataResponse:
+    """Create trip data for the given location."""
+    return TripDataResponse(
+        location=location,
+        days=3,
+        transport=TransportType.TRAIN,
+        occasion="business"
+    )
+
+
+class TestChecklistBatcher:
+    """Test cases for ChecklistBatcher."""
+
+    @pytest.fixture
+    def mock_generator(self):
+        """Create a mock generator that echoes the trip location."""
+        generator = Mock()
+        generator.generate_checklist = AsyncMock(side_effect=lambda trip: f"checklist for {trip.location}")
+        return generator
+
+    @pytest.mark.asyncio
+    async def test_submit_without_consumer_calls_generator(self, mock_generator):
+        """Test that requests pass straight through when the batcher is not started."""
+        batcher = ChecklistBatcher(mock_generator)
+
+        result = await batcher.submit(make_trip("Tokyo"))
+
+        assert result == "checklist for Tokyo"
+        mock_generator.generate_checklist.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_are_batched(self, mock_generator):
+        """Test that concurrent requests each receive their own result."""
+        batcher = ChecklistBatcher(mock_generator, max_batch_size=4)
+        batcher.start()
+        try:
+            locations = ["Paris", "Rome", "Berlin", "Madrid", "Lisbon"]
+            results = await asyncio.gather(*(batcher.submit(make_trip(loc)) for loc in locations))
+        finally:
+            await batcher.stop()
+
+        assert results == [f"checklist for {loc}" for loc in locations]
+        assert mock_generator.generate_checklist.call_count == 5
+        assert not batcher.running
+
+    @pytest.mark.asyncio
+    async def test_stop_finishes_in_flight_requests(self, mock_generator):
+        """Test that stop waits for a dispatched request instead of dropping it."""
+        release = asyncio.Event()
+
+        async def generate(trip):
+            await release.wait()
+            return f"checklist for {trip.location}"
+
+        mock_generator.generate_checklist = AsyncMock(side_effect=generate)
+        batcher = ChecklistBatcher(mock_generator, max_batch_size=4)
+        batcher.start()
+        pending = asyncio.create_task(batcher.submit(make_trip("Paris")))
+        await asyncio.sleep(0.01)
+
+        stopping = asyncio.create_task(batcher.stop())
+        await asyncio.sleep(0.01)
+        assert not stopping.done()
+
+        release.set()
+        await asyncio.wait_for(stopping, timeout=1)
+        assert await asyncio.wait_for(pending, timeout=1) == "checklist for Paris"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_requests_are_not_generated(self, mock_generator):
+        """Test that a request cancelled before dispatch is skipped."""
+        batcher = ChecklistBatcher(mock_generator)
+        loop = asyncio.get_running_loop()
+        cancelled, live = loop.create_future(), loop.create_future()
+        cancelled.cancel()
+
+        await batcher._dispatch([(make_trip("Nowhere"), cancelled), (make_trip("Paris"), live)])
+
+        assert live.result() == "checklist for Paris"
+        mock_generator.generate_checklist.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_errors_are_isolated_per_request(self, mock_generator):
+        """Test that a failing request does not affect the rest of its batch."""
+        async def generate(trip):
+            if trip.location == "Nowhere":
+                raise ValueError("generation failed")
+            return f"checklist for {trip.location}"
+
+        mock_generator.generate_checklist = AsyncMock(side_effect=generate)
+        batcher = ChecklistBatcher(mock_generator, max_batch_size=4)
+        batcher.start()
+        try:
+            results = await asyncio.gather(
+                batcher.submit(make_trip("Paris")),
+                batcher.submit(make_trip("Nowhere")),
+                return_exceptions=True
+            )
+        finally:
+            await batcher.stop()
+
+        assert results[0] == "checklist for Paris"
+        assert isinstance(results[1], ValueError)
@@ -6,33 +6,57 @@ and integration with the checklist generation service.
 """
 
 import pytest
-from unittest.mock import Mock, AsyncMock, patch
-from fastapi.testclient import TestClient
+from unittest.mock import Mock
 from datetime import datetime, timedelta
 import json
 
 from main import app
+from app.api.routes import get_checklist_batcher
+from app.core.auth import get_current_active_user
 from app.models.trip import TripDataResponse, TransportType
 from app.models.checklist import ChecklistGenerationResponse, ChecklistItemResponse, PriorityLevel
 from app.services.checklist_generator import ChecklistGenerationError
 from app.services.groq_client import GroqAPIError, GroqRateLimitError
 
+# Fixed timestamp for the sample models, taken once at import
+_NOW = datetime.utcnow()
+
+
+class _StubBatcher:
+    """Stand-in for ChecklistBatcher that returns, or raises, a fixed result."""
+    
+    def __init__(self, result=None):
+        self.result = result
+        self.calls = []
+    
+    async def submit(self, trip_data):
+        self.calls.append(trip_data)
+        if isinstance(self.result, BaseException):
+            raise self.result
+        return self.result
+
 
 class TestChecklistGenerationEndpoint:
     """Test cases for the /generate-checklist endpoint."""
     
-    @pytest.fixture
-    def client(self):
-        """Create a test client."""
-        return TestClient(app)
-    
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def auth_headers(self):
         """Create authentication headers with a valid token."""
         # This would normally use a real token, but for testing we'll mock the auth
         return {"Authorization": "Bearer test-token"}
     
     @pytest.fixture
+    def mocked_auth_and_batcher(self):
+        """Override the auth and batcher dependencies and yield the user and stub batcher."""
+        mock_user = Mock(username="testuser", user_id="user-123")
+        batcher = _StubBatcher()
+        app.dependency_overrides[get_current_active_user] = lambda: mock_user
+        app.dependency_overrides[get_checklist_batcher] = lambda: batcher
+        yield mock_user, batcher
+        app.dependency_overrides.pop(get_current_active_user, None)
+        app.dependency_overrides.pop(get_checklist_batcher, None)
+    
+    @pytest.fixture(scope="module")
     def sample_request_data(self):
         """Create sample request data for checklist generation."""
         return {
@@ -46,7 +70,7 @@ class TestChecklistGenerationEndpoint:
             }
         }
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def sample_checklist_response(self):
         """Create a sample checklist response."""
         items = [
@@ -57,8 +81,8 @@ class TestChecklistGenerationEndpoint:
                 checked=False,
                 priority=PriorityLevel.HIGH,
                 user_added=False,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
+                created_at=_NOW,
+                updated_at=_NOW
             ),
             ChecklistItemResponse(
                 id="item-2",
@@ -67,15 +91,15 @@ class TestChecklistGenerationEndpoint:
                 checked=False,
                 priority=PriorityLevel.MEDIUM,
                 user_added=False,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
+                created_at=_NOW,
+                updated_at=_NOW
             )
         ]
         
         return ChecklistGenerationResponse(
             id="checklist-123",
             items=items,
-            generated_at=datetime.utcnow(),
+            generated_at=_NOW,
             trip_data=TripDataResponse(
                 location="Paris, France",
                 days=5,
@@ -86,23 +110,16 @@ class TestChecklistGenerationEndpoint:
             )
         )
     
-    @patch('app.api.routes.get_current_active_user')
-    @patch('app.api.routes.create_checklist_generator')
-    def test_generate_checklist_success(self, mock_create_generator, mock_get_user, client, auth_headers, sample_request_data, sample_checklist_response):
+    @pytest.mark.asyncio
+    async def test_generate_checklist_success(self, mocked_auth_and_batcher, aclient, auth_headers, sample_request_data, sample_checklist_response):
         """Test successful checklist generation."""
-        # Mock authentication
-        mock_user = Mock()
-        mock_user.username = "testuser"
-        mock_user.user_id = "user-123"
-        mock_get_user.return_value = mock_user
+        _, batcher = mocked_auth_and_batcher
         
-        # Mock checklist generator
-        mock_generator = Mock()
-        mock_generator.generate_checklist = AsyncMock(return_value=sample_checklist_response)
-        mock_create_generator.return_value = mock_generator
+        # Stub checklist batcher
+        batcher.result = sample_checklist_response
         
         # Make request
-        response = client.post(
+        response = await aclient.post(
             "/api/v1/generate-checklist",
             json=sample_request_data,
             headers=auth_headers
@@ -119,31 +136,27 @@ class TestChecklistGenerationEndpoint:
         assert response_data["items"][0]["priority"] == "high"
         assert response_data["trip_data"]["location"] == "Paris, France"
         
-        # Verify service was called correctly
-        mock_generator.generate_checklist.assert_called_once()
-        call_args = mock_generator.generate_checklist.call_args[0][0]
+        # Verify batcher was called correctly
+        assert len(batcher.calls) == 1
+        call_args = batcher.calls[-1]
         assert call_args.location == "Paris, France"
         assert call_args.days == 5
         assert call_args.transport == TransportType.PLANE
     
-    def test_generate_checklist_no_auth(self, client, sample_request_data):
+    @pytest.mark.asyncio
+    async def test_generate_checklist_no_auth(self, aclient, sample_request_data):
         """Test checklist generation without authentication."""
-        response = client.post(
+        response = await aclient.post(
             "/api/v1/generate-checklist",
             json=sample_request_data
         )
         
-        assert response.status_code == 401
-        assert "Not authenticated" in response.json()["detail"]
+        assert response.status_code == 403  # No token provided
+        assert "Not authenticated" in response.json()["message"]
     
-    @patch('app.api.routes.get_current_active_user')
-    def test_generate_checklist_invalid_request_data(self, mock_get_user, client, auth_headers):
+    @pytest.mark.asyncio
+    async def test_generate_checklist_invalid_request_data(self, mocked_auth_and_batcher, aclient, auth_headers):
         """Test checklist generation with invalid request data."""
-        # Mock authentication
-        mock_user = Mock()
-        mock_user.username = "testuser"
-        mock_get_user.return_value = mock_user
-        
         # Invalid request data (missing required fields)
         invalid_data = {
             "trip_data": {
@@ -154,7 +167,7 @@ class TestChecklistGenerationEndpoint:
             }
         }
         
-        response = client.post(
+        response = await aclient.post(
             "/api/v1/generate-checklist",
             json=invalid_data,
             headers=auth_headers
@@ -162,119 +175,81 @@ class TestChecklistGenerationEndpoint:
         
         assert response.status_code == 422  # Validation error
     
-    @patch('app.api.routes.get_current_active_user')
-    @patch('app.api.routes.create_checklist_generator')
-    def test_generate_checklist_generation_error(self, mock_create_generator, mock_get_user, client, auth_headers, sample_request_data):
+    @pytest.mark.asyncio
+    async def test_generate_checklist_generation_error(self, mocked_auth_and_batcher, aclient, auth_headers, sample_request_data):
         """Test handling of checklist generation errors."""
-        # Mock authentication
-        mock_user = Mock()
-        mock_user.username = "testuser"
-        mock_get_user.return_value = mock_user
-        
-        # Mock generator to raise error
-        mock_generator = Mock()
-        mock_generator.generate_checklist = AsyncMock(
-            side_effect=ChecklistGenerationError("Generation failed")
-        )
-        mock_create_generator.return_value = mock_generator
+        _, batcher = mocked_auth_and_batcher
         
-        response = client.post(
+        # Stub batcher to raise error
+        batcher.result = ChecklistGenerationError("Generation failed")
+        
+        response = await aclient.post(
             "/api/v1/generate-checklist",
             json=sample_request_data,
             headers=auth_headers
         )
         
         assert response.status_code == 500
-        assert "Failed to generate checklist" in response.json()["detail"]
+        assert "Failed to generate checklist" in response.json()["message"]
     
-    @patch('app.api.routes.get_current_active_user')
-    @patch('app.api.routes.create_checklist_generator')
-    def test_generate_checklist_rate_limit_error(self, mock_create_generator, mock_get_user, client, auth_headers, sample_request_data):
+    @pytest.mark.asyncio
+    async def test_generate_checklist_rate_limit_error(self, mocked_auth_and_batcher, aclient, auth_headers, sample_request_data):
         """Test handling of rate limit errors."""
-        # Mock authentication
-        mock_user = Mock()
-        mock_user.username = "testuser"
-        mock_get_user.return_value = mock_user
-        
-        # Mock generator to raise rate limit error
-        mock_generator = Mock()
-        mock_generator.generate_checklist = AsyncMock(
-            side_effect=GroqRateLimitError("Rate limit exceeded")
-        )
-        mock_create_generator.return_value = mock_generator
+        _, batcher = mocked_auth_and_batcher
         
-        response = client.post(
+        # Stub batcher to raise rate limit error
+        batcher.result = GroqRateLimitError("Rate limit exceeded")
+        
+        response = await aclient.post(
             "/api/v1/generate-checklist",
             json=sample_request_data,
             headers=auth_headers
         )
         
         assert response.status_code == 503
-        assert "temporarily unavailable due to rate limiting" in response.json()["detail"]
+        assert "temporarily unavailable due to rate limiting" in response.json()["message"]
     
-    @patch('app.api.routes.get_current_active_user')
-    @patch('app.api.routes.create_checklist_generator')
-    def test_generate_checklist_groq_api_error(self, mock_create_generator, mock_get_user, client, auth_headers, sample_request_data):
+    @pytest.mark.asyncio
+    async def test_generate_checklist_groq_api_error(self, mocked_auth_and_batcher, aclient, auth_headers, sample_request_data):
         """Test handling of Groq API errors."""
-        # Mock authentication
-        mock_user = Mock()
-        mock_user.username = "testuser"
-        mock_get_user.return_value = mock_user
-        
-        # Mock generator to raise API error
-        mock_generator = Mock()
-        mock_generator.generate_checklist = AsyncMock(
-            side_effect=GroqAPIError("API error")
-        )
-        mock_create_generator.return_value = mock_generator
+        _, batcher = mocked_auth_and_batcher
         
-        response = client.post(
+        # Stub batcher to raise API error
+        batcher.result = GroqAPIError("API error")
+        
+        response = await aclient.post(
             "/api/v1/generate-checklist",
             json=sample_request_data,
             headers=auth_headers
         )
         
         assert response.status_code == 503
-        assert "AI service temporarily unavailable" in response.json()["detail"]
+        assert "AI service temporarily unavailable" in response.json()["message"]
     
-    @patch('app.api.routes.get_current_active_user')
-    @patch('app.api.routes.create_checklist_generator')
-    def test_generate_checklist_unexpected_error(self, mock_create_generator, mock_get_user, client, auth_headers, sample_request_data):
+    @pytest.mark.asyncio
+    async def test_generate_checklist_unexpected_error(self, mocked_auth_and_batcher, aclient, auth_headers, sample_request_data):
         """Test handling of unexpected errors."""
-        # Mock authentication
-        mock_user = Mock()
-        mock_user.username = "testuser"
-        mock_get_user.return_value = mock_user
-        
-        # Mock generator to raise unexpected error
-        mock_generator = Mock()
-        mock_generator.generate_checklist = AsyncMock(
-            side_effect=Exception("Unexpected error")
-        )
-        mock_create_generator.return_value = mock_generator
+        _, batcher = mocked_auth_and_batcher
         
-        response = client.post(
+        # Stub batcher to raise unexpected error
+        batcher.result = Exception("Unexpected error")
+        
+        response = await aclient.post(
             "/api/v1/generate-checklist",
             json=sample_request_data,
             headers=auth_headers
         )
         
         assert response.status_code == 500
-        assert "unexpected error occurred" in response.json()["detail"]
+        assert "unexpected error occurred" in response.json()["message"]
     
-    @patch('app.api.routes.get_current_active_user')
-    @patch('app.api.routes.create_checklist_generator')
-    def test_generate_checklist_minimal_data(self, mock_create_generator, mock_get_user, client, auth_headers, sample_checklist_response):
+    @pytest.mark.asyncio
+    async def test_generate_checklist_minimal_data(self, mocked_auth_and_batcher, aclient, auth_headers, sample_checklist_response):
         """Test checklist generation with minimal trip data."""
-        # Mock authentication
-        mock_user = Mock()
-        mock_user.username = "testuser"
-        mock_get_user.return_value = mock_user
+        _, batcher = mocked_auth_and_batcher
         
-        # Mock checklist generator
-        mock_generator = Mock()
-        mock_generator.generate_checklist = AsyncMock(return_value=sample_checklist_response)
-        mock_create_generator.return_value = mock_generator
+        # Stub checklist batcher
+        batcher.result = sample_checklist_response
         
         # Minimal request data
         minimal_data = {
@@ -286,7 +261,7 @@ class TestChecklistGenerationEndpoint:
             }
         }
         
-        response = client.post(
+        response = await aclient.post(
             "/api/v1/generate-checklist",
             json=minimal_data,
             headers=auth_headers
@@ -296,9 +271,9 @@ class TestChecklistGenerationEndpoint:
         response_data = response.json()
         assert response_data["id"] == "checklist-123"
         
-        # Verify service was called with minimal data
-        mock_generator.generate_checklist.assert_called_once()
-        call_args = mock_generator.generate_checklist.call_args[0][0]
+        # Verify batcher was called with minimal data
+        assert len(batcher.calls) == 1
+        call_args = batcher.calls[-1]
         assert call_args.location == "Tokyo"
         assert call_args.days == 3
         assert call_args.transport == TransportType.TRAIN
@@ -306,102 +281,55 @@ class TestChecklistGenerationEndpoint:
         assert call_args.notes is None
         assert call_args.preferences is None
     
-    @patch('app.api.routes.get_current_active_user')
-    @patch('app.api.routes.create_checklist_generator')
-    def test_generate_checklist_all_transport_types(self, mock_create_generator, mock_get_user, client, auth_headers, sample_checklist_response):
-        """Test checklist generation with different transport types."""
-        # Mock authentication
-        mock_user = Mock()
-        mock_user.username = "testuser"
-        mock_get_user.return_value = mock_user
-        
-        # Mock checklist generator
-        mock_generator = Mock()
-        mock_generator.generate_checklist = AsyncMock(return_value=sample_checklist_response)
-        mock_create_generator.return_value = mock_generator
-        
-        transport_types = ["car", "train", "plane", "bus", "other"]
-        
-        for transport in transport_types:
-            request_data = {
-                "trip_data": {
-                    "location": "Test Location",
-                    "days": 3,
-                    "transport": transport,
-                    "occasion": "test"
-                }
+    @pytest.mark.parametrize("transport", ["car", "train", "plane", "bus", "other"])
+    @pytest.mark.asyncio
+    async def test_generate_checklist_transport_type(self, mocked_auth_and_batcher, aclient, auth_headers, sample_checklist_response, transport):
+        """Test checklist generation with each transport type."""
+        _, batcher = mocked_auth_and_batcher
+        
+        # Stub checklist batcher
+        batcher.result = sample_checklist_response
+        
+        request_data = {
+            "trip_data": {
+                "location": "Test Location",
+                "days": 3,
+                "transport": transport,
+                "occasion": "test"
             }
-            
-            response = client.post(
-                "/api/v1/generate-checklist",
-                json=request_data,
-                headers=auth_headers
-            )
-            
-            assert response.status_code == 200, f"Failed for transport type: {transport}"
-            
-            # Verify correct transport type was passed
-            call_args = mock_generator.generate_checklist.call_args[0][0]
-            assert call_args.transport.value == transport
+        }
+        
+        response = await aclient.post(
+            "/api/v1/generate-checklist",
+            json=request_data,
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200, f"Failed for transport type: {transport}"
+        
+        # Verify correct transport type was passed
+        call_args = batcher.calls[-1]
+        assert call_args.transport.value == transport
     
-    def test_generate_checklist_request_validation_edge_cases(self, client, auth_headers):
+    @pytest.mark.parametrize("trip_data", [
+        {"location": "Test", "days": 400, "transport": "plane", "occasion": "test"},
+        {"location": "Test", "days": 0, "transport": "plane", "occasion": "test"},
+        {"location": "A", "days": 3, "transport": "plane", "occasion": "test"},
+        {"location": "Test", "days": 3, "transport": "spaceship", "occasion": "test"},
+    ], ids=["days_too_high", "days_too_low", "location_too_short", "invalid_transport"])
+    @pytest.mark.asyncio
+    async def test_generate_checklist_request_validation_edge_cases(self, mocked_auth_and_batcher, aclient, auth_headers, trip_data):
         """Test request validation with edge cases."""
-        with patch('app.api.routes.get_current_active_user') as mock_get_user:
-            mock_user = Mock()
-            mock_user.username = "testuser"
-            mock_get_user.return_value = mock_user
-            
-            # Test cases with invalid data
-            test_cases = [
-                # Days too high
-                {
-                    "trip_data": {
-                        "location": "Test",
-                        "days": 400,  # Over limit
-                        "transport": "plane",
-                        "occasion": "test"
-                    }
-                },
-                # Days too low
-                {
-                    "trip_data": {
-                        "location": "Test",
-                        "days": 0,  # Under limit
-                        "transport": "plane",
-                        "occasion": "test"
-                    }
-                },
-                # Location too short
-                {
-                    "trip_data": {
-                        "location": "A",  # Too short
-                        "days": 3,
-                        "transport": "plane",
-                        "occasion": "test"
-                    }
-                },
-                # Invalid transport
-                {
-                    "trip_data": {
-                        "location": "Test",
-                        "days": 3,
-                        "transport": "spaceship",  # Invalid
-                        "occasion": "test"
-                    }
-                }
-            ]
-            
-            for i, test_case in enumerate(test_cases):
-                response = client.post(
-                    "/api/v1/generate-checklist",
-                    json=test_case,
-                    headers=auth_headers
-                )
-                
-                assert response.status_code == 422, f"Test case {i} should fail validation"
-
+        response = await aclient.post(
+            "/api/v1/generate-checklist",
+            json={"trip_data": trip_data},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 422, f"Should fail validation: {trip_data}"
 
 @pytest.mark.integration
+@pytest.mark.serial
 class TestChecklistEndpointIntegration:
     """Integration tests for checklist endpoints."""
     
@@ -16,7 +16,9 @@ from app.models.checklist import ChecklistGenerationResponse, PriorityLevel
 from app.services.checklist_generator import (
     ChecklistGeneratorService,
     ChecklistGenerationError,
-    create_checklist_generator
+    create_checklist_generator,
+    _FALLBACK_ITEMS,
+    _transport_mask
 )
 from app.services.groq_client import GroqClient, GroqAPIError, GroqRateLimitError
 
@@ -300,8 +302,8 @@ class TestChecklistGeneratorService:
     
     def test_should_skip_item_for_transport(self, generator_service):
         """Test transport-specific item filtering."""
-        car_item = {"text": "Car registration", "category": "Documents", "priority": "high"}
-        plane_item = {"text": "Boarding pass", "category": "Documents", "priority": "high"}
+        car_item = _transport_mask("Car registration")
+        plane_item = _transport_mask("Boarding pass")
         
         # Car item should be skipped for plane travel
         assert generator_service._should_skip_item_for_transport(car_item, TransportType.PLANE) is True
@@ -346,16 +348,16 @@ class TestChecklistGeneratorService:
         assert response.generated_at is not None
         assert response.id is not None
     
-    def test_load_fallback_items(self, generator_service):
-        """Test loading fallback items."""
-        items = generator_service._load_fallback_items()
+    def test_fallback_items(self):
+        """Test the fallback item templates."""
+        items = _FALLBACK_ITEMS
         
         assert len(items) > 0
-        assert all(isinstance(item, dict) for item in items)
-        assert all("text" in item and "category" in item and "priority" in item for item in items)
+        assert all(isinstance(item, tuple) and len(item) == 3 for item in items)
+        assert all(isinstance(priority, PriorityLevel) for _, _, priority in items)
         
         # Check for essential categories
-        categories = [item["category"] for item in items]
+        categories = [category for _, category, _ in items]
         assert "Documents" in categories
         assert "Clothing" in categories
         assert "Health" in categories or "Toiletries" in categories
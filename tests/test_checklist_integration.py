@@ -11,7 +11,7 @@ from unittest.mock import Mock, AsyncMock, patch
 from app.services import groq_client, create_checklist_generator
 from app.services.checklist_generator import ChecklistGenerationError
 from app.services.groq_client import GroqAPIError, GroqRateLimitError
-from app.models.trip import TripDataResponse, TransportType
+from app.models.trip import TripDataRequest, TripDataResponse, TransportType
 from app.models.checklist import ChecklistGenerationRequest
 
 
@@ -119,7 +119,7 @@ class TestChecklistServiceIntegration:
             "occasion": "business"
         }
         
-        trip_data = TripDataResponse(**valid_data)
+        trip_data = TripDataRequest(**valid_data)
         request = ChecklistGenerationRequest(trip_data=trip_data)
         
         assert request.trip_data.location == "Tokyo, Japan"
@@ -7,9 +7,8 @@ and mocked API responses.
 
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
-from groq.types.chat.chat_completion import ChatCompletion, Choice
-from groq.types.chat.chat_completion_message import ChatCompletionMessage
 
+from app.core.config import settings
 from app.services.groq_client import (
     GroqClient,
     GroqAPIError,
@@ -17,47 +16,58 @@ from app.services.groq_client import (
 )
 
 
+class FakeStream:
+    """Async iterable standing in for a streamed Groq completion."""
+    
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.consumed = 0
+        self.close = AsyncMock()
+    
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            self.consumed += 1
+            yield chunk
+    
+    @classmethod
+    def of(cls, *contents):
+        """Create a stream with one chunk per content string."""
+        return cls(Mock(choices=[Mock(delta=Mock(content=content))]) for content in contents)
+
+
 class TestGroqClient:
     """Test cases for GroqClient class."""
     
     @pytest.fixture
     def mock_groq_response(self):
-        """Create a mock Groq API response."""
-        mock_message = Mock(spec=ChatCompletionMessage)
-        mock_message.content = "Test response content"
-        
-        mock_choice = Mock(spec=Choice)
-        mock_choice.message = mock_message
-        
-        mock_response = Mock(spec=ChatCompletion)
-        mock_response.choices = [mock_choice]
-        
-        return mock_response
+        """Create a mock streamed Groq API response."""
+        return FakeStream.of("Test response ", "content")
     
     @pytest.fixture
     def groq_client(self):
         """Create a GroqClient instance for testing."""
-        with patch('app.services.groq_client.settings') as mock_settings:
+        with patch('app.services.groq_client.settings', settings.model_copy()) as mock_settings:
             mock_settings.GROQ_API_KEY = "test-api-key"
             mock_settings.GROQ_MODEL = "test-model"
             
-            with patch('app.services.groq_client.Groq') as mock_groq:
+            with patch('app.services.groq_client.AsyncGroq') as mock_groq:
                 client = GroqClient()
                 client.client = mock_groq.return_value
+                client.client.chat.completions.create = AsyncMock()
                 return client
     
     def test_init_with_api_key(self):
         """Test GroqClient initialization with API key."""
-        with patch('app.services.groq_client.Groq') as mock_groq:
+        with patch('app.services.groq_client.AsyncGroq') as mock_groq:
             client = GroqClient(api_key="test-key", model="test-model")
             
             assert client.api_key == "test-key"
             assert client.model == "test-model"
-            mock_groq.assert_called_once_with(api_key="test-key")
+            mock_groq.assert_called_once_with(api_key="test-key", http_client=client.http_client)
     
     def test_init_without_api_key_raises_error(self):
         """Test that initialization without API key raises error."""
-        with patch('app.services.groq_client.settings') as mock_settings:
+        with patch('app.services.groq_client.settings', settings.model_copy()) as mock_settings:
             mock_settings.GROQ_API_KEY = ""
             
             with pytest.raises(GroqAPIError, match="Groq API key is required"):
@@ -65,11 +75,11 @@ class TestGroqClient:
     
     def test_init_uses_settings_defaults(self):
         """Test that initialization uses settings for defaults."""
-        with patch('app.services.groq_client.settings') as mock_settings:
+        with patch('app.services.groq_client.settings', settings.model_copy()) as mock_settings:
             mock_settings.GROQ_API_KEY = "settings-key"
             mock_settings.GROQ_MODEL = "settings-model"
             
-            with patch('app.services.groq_client.Groq') as mock_groq:
+            with patch('app.services.groq_client.AsyncGroq') as mock_groq:
                 client = GroqClient()
                 
                 assert client.api_key == "settings-key"
@@ -87,8 +97,10 @@ class TestGroqClient:
             model="test-model",
             messages=[{"role": "user", "content": "Test prompt"}],
             max_tokens=1000,
-            temperature=0.7
+            temperature=0.7,
+            stream=True
         )
+        mock_groq_response.close.assert_awaited_once()
     
     @pytest.mark.asyncio
     async def test_generate_completion_with_custom_params(self, groq_client, mock_groq_response):
@@ -108,15 +120,14 @@ class TestGroqClient:
             messages=[{"role": "user", "content": "Test prompt"}],
             max_tokens=500,
             temperature=0.5,
+            stream=True,
             top_p=0.9
         )
     
     @pytest.mark.asyncio
     async def test_generate_completion_no_choices_error(self, groq_client):
         """Test error handling when no choices are returned."""
-        mock_response = Mock(spec=ChatCompletion)
-        mock_response.choices = []
-        groq_client.client.chat.completions.create.return_value = mock_response
+        groq_client.client.chat.completions.create.return_value = FakeStream([Mock(choices=[])])
         
         with pytest.raises(GroqAPIError, match="No response choices returned"):
             await groq_client.generate_completion("Test prompt")
@@ -124,20 +135,23 @@ class TestGroqClient:
     @pytest.mark.asyncio
     async def test_generate_completion_empty_content_error(self, groq_client):
         """Test error handling when empty content is returned."""
-        mock_message = Mock(spec=ChatCompletionMessage)
-        mock_message.content = None
-        
-        mock_choice = Mock(spec=Choice)
-        mock_choice.message = mock_message
-        
-        mock_response = Mock(spec=ChatCompletion)
-        mock_response.choices = [mock_choice]
-        
-        groq_client.client.chat.completions.create.return_value = mock_response
+        groq_client.client.chat.completions.create.return_value = FakeStream.of(None, "")
         
         with pytest.raises(GroqAPIError, match="Empty content returned"):
             await groq_client.generate_completion("Test prompt")
     
+    @pytest.mark.asyncio
+    async def test_generate_completion_stops_at_json_end(self, groq_client):
+        """Test that the stream is closed once the first JSON object is complete."""
+        stream = FakeStream.of('Here: {"a": "}{", ', '"b": {"c": "\\""}} and', " more", " text")
+        groq_client.client.chat.completions.create.return_value = stream
+        
+        result = await groq_client.generate_completion("Test prompt", stop_at_json_end=True)
+        
+        assert result == 'Here: {"a": "}{", "b": {"c": "\\""}}'
+        assert stream.consumed == 2
+        stream.close.assert_awaited_once()
+    
     @pytest.mark.asyncio
     async def test_generate_completion_rate_limit_error(self, groq_client):
         """Test rate limit error handling."""
@@ -162,41 +176,71 @@ class TestGroqClient:
         with pytest.raises(GroqAPIError, match="Failed to generate completion"):
             await groq_client.generate_completion("Test prompt")
     
-    def test_validate_api_key_success(self, groq_client, mock_groq_response):
+    @pytest.mark.asyncio
+    async def test_validate_api_key_success(self, groq_client):
         """Test successful API key validation."""
-        groq_client.client.chat.completions.create.return_value = mock_groq_response
+        groq_client.client.models.list = AsyncMock(return_value=Mock(data=[Mock(id="test-model")]))
         
-        result = groq_client.validate_api_key()
+        result = await groq_client.validate_api_key()
         
         assert result is True
-        groq_client.client.chat.completions.create.assert_called_once_with(
-            model="test-model",
-            messages=[{"role": "user", "content": "Hello"}],
-            max_tokens=5
-        )
+        groq_client.client.models.list.assert_called_once_with()
+        groq_client.client.chat.completions.create.assert_not_called()
     
-    def test_validate_api_key_failure(self, groq_client):
+    @pytest.mark.asyncio
+    async def test_validate_api_key_failure(self, groq_client):
         """Test API key validation failure."""
-        groq_client.client.chat.completions.create.side_effect = Exception("Invalid API key")
+        groq_client.client.models.list = AsyncMock(side_effect=Exception("Invalid API key"))
         
-        result = groq_client.validate_api_key()
+        result = await groq_client.validate_api_key()
         
         assert result is False
     
-    def test_validate_api_key_no_choices(self, groq_client):
-        """Test API key validation with no choices returned."""
-        mock_response = Mock(spec=ChatCompletion)
-        mock_response.choices = []
-        groq_client.client.chat.completions.create.return_value = mock_response
+    @pytest.mark.asyncio
+    async def test_validate_api_key_no_models(self, groq_client):
+        """Test API key validation with no models returned."""
+        groq_client.client.models.list = AsyncMock(return_value=Mock(data=[]))
         
-        result = groq_client.validate_api_key()
+        result = await groq_client.validate_api_key()
         
         assert result is False
     
-    def test_get_model_info(self, groq_client):
+    @pytest.mark.asyncio
+    async def test_is_api_key_valid_is_cached(self, groq_client):
+        """Test that the validation result is reused within the TTL."""
+        groq_client.client.models.list = AsyncMock(return_value=Mock(data=[Mock(id="test-model")]))
+        
+        assert await groq_client.is_api_key_valid() is True
+        assert await groq_client.is_api_key_valid() is True
+        
+        groq_client.client.models.list.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_close_closes_http_client(self, groq_client):
+        """Test that closing the client closes its pooled HTTP connections."""
+        await groq_client.close()
+        
+        assert groq_client.http_client.is_closed
+    
+    @pytest.mark.asyncio
+    async def test_generate_completion_reopens_after_close(self, groq_client, mock_groq_response):
+        """Test that a client closed by one app shutdown still works after the next startup."""
+        await groq_client.close()
+        
+        with patch('app.services.groq_client.AsyncGroq') as mock_groq:
+            mock_groq.return_value.chat.completions.create = AsyncMock(return_value=mock_groq_response)
+            result = await groq_client.generate_completion("Test prompt")
+        
+        assert result == "Test response content"
+        assert not groq_client.http_client.is_closed
+        mock_groq.assert_called_once_with(api_key="test-api-key", http_client=groq_client.http_client)
+        await groq_client.close()
+    
+    @pytest.mark.asyncio
+    async def test_get_model_info(self, groq_client):
         """Test getting model information."""
-        with patch.object(groq_client, 'validate_api_key', return_value=True):
-            info = groq_client.get_model_info()
+        with patch.object(groq_client, 'is_api_key_valid', AsyncMock(return_value=True)):
+            info = await groq_client.get_model_info()
             
             expected = {
                 "model": "test-model",
@@ -205,18 +249,19 @@ class TestGroqClient:
             }
             assert info == expected
     
-    def test_get_model_info_no_api_key(self):
+    @pytest.mark.asyncio
+    async def test_get_model_info_no_api_key(self):
         """Test getting model information without API key."""
-        with patch('app.services.groq_client.settings') as mock_settings:
+        with patch('app.services.groq_client.settings', settings.model_copy()) as mock_settings:
             mock_settings.GROQ_API_KEY = ""
             mock_settings.GROQ_MODEL = "test-model"
             
-            with patch('app.services.groq_client.Groq'):
+            with patch('app.services.groq_client.AsyncGroq'):
                 try:
                     client = GroqClient(api_key="test")
                     client.api_key = ""  # Simulate no API key
                     
-                    info = client.get_model_info()
+                    info = await client.get_model_info()
                     
                     expected = {
                         "model": "test-model",
@@ -1,6 +1,10 @@
 import pytest
 from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
 from main import app
+from app.core.security import SecurityHeadersMiddleware
 
 client = TestClient(app)
 
@@ -40,4 +44,63 @@ def test_readiness_check():
     data = response.json()
     assert "status" in data
     assert "timestamp" in data
-    assert data["status"] == "ready"
\ No newline at end of file
+    assert data["status"] == "ready"
+
+def test_security_headers_are_added():
+    response = client.get("/")
+    assert response.status_code == 200
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+    assert response.headers["X-Frame-Options"] in ["DENY", "SAMEORIGIN"]
+
+
+def test_security_headers_replace_route_headers():
+    async def frame_route(request):
+        return PlainTextResponse("ok", headers={"X-Frame-Options": "ALLOWALL", "Cache-Control": "no-store"})
+
+    route_client = TestClient(SecurityHeadersMiddleware(Starlette(routes=[Route("/", frame_route)])))
+    response = route_client.get("/")
+    assert response.headers.get_list("X-Frame-Options") in (["DENY"], ["SAMEORIGIN"])
+    assert response.headers.get_list("Cache-Control") == ["no-store"]
+
+
+def test_oversized_request_is_rejected():
+    response = client.post(
+        "/api/v1/auth/login",
+        content=b"{}",
+        headers={"Content-Type": "application/json", "Content-Length": str(11 * 1024 * 1024)}
+    )
+    assert response.status_code == 413
+    assert response.json()["error"] == "REQUEST_TOO_LARGE"
+
+
+def test_health_check_is_cached(monkeypatch):
+    # Start from an empty cache so both requests fall inside one TTL window
+    monkeypatch.setattr("app.core.health._health_cache", None)
+    first = client.get("/health").json()
+    second = client.get("/health").json()
+    assert first["timestamp"] == second["timestamp"]
+
+
+def test_large_responses_are_gzipped():
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+
+
+def test_small_responses_are_not_gzipped():
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_liveness_check_bypasses_middleware():
+    response = client.get("/health/live")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/json"
+    # Answered before SecurityHeadersMiddleware runs
+    assert "X-Content-Type-Options" not in response.headers
+
+
+def test_liveness_body_is_reused_within_a_second():
+    first = client.get("/health/live").json()
+    second = client.get("/health/live").json()
+    assert first == second
@@ -10,7 +10,8 @@ from app.models.auth import (
     UserRegistration,
     UserResponse,
     TokenResponse,
-    TokenData
+    TokenData,
+    UserInfoResponse
 )
 
 
@@ -280,4 +281,30 @@ class TestTokenData:
         
         assert token_data.username == "partialuser"
         assert token_data.user_id is None
-        assert token_data.expires_at is None
\ No newline at end of file
+        assert token_data.expires_at is None
+
+
+class TestUserInfoResponse:
+    """Test cases for UserInfoResponse model."""
+    
+    def test_valid_user_info(self):
+        """Test creating user info with the default message."""
+        expires_at = datetime.utcnow()
+        
+        user_info = UserInfoResponse(
+            username="infouser",
+            user_id="user-123",
+            expires_at=expires_at
+        )
+        
+        assert user_info.username == "infouser"
+        assert user_info.user_id == "user-123"
+        assert user_info.expires_at == expires_at
+        assert user_info.message == "Authentication successful"
+    
+    def test_user_info_is_frozen(self):
+        """Test that user info cannot be modified after creation."""
+        user_info = UserInfoResponse(username="infouser")
+        
+        with pytest.raises(ValidationError):
+            user_info.username = "changed"
\ No newline at end of file
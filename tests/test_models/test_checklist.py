@@ -15,7 +15,7 @@ from app.models.checklist import (
     ChecklistGenerationResponse,
     PriorityLevel
 )
-from app.models.trip import TripDataResponse, TransportType
+from app.models.trip import TripDataRequest, TripDataResponse, TransportType
 
 
 class TestChecklistItemRequest:
@@ -312,7 +312,7 @@ class TestChecklistGenerationRequest:
     
     def test_valid_checklist_generation_request(self):
         """Test creating a valid checklist generation request."""
-        trip_data = TripDataResponse(
+        trip_data = TripDataRequest(
             location="Adelaide",
             days=4,
             transport=TransportType.BUS,
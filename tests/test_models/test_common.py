@@ -2,7 +2,7 @@
 Tests for common Pydantic models.
 """
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List
 from pydantic import ValidationError
 
@@ -15,6 +15,9 @@ from app.models.common import (
     PaginatedResponse
 )
 
+# Default timestamps are reused for up to 1ms, so may slightly predate creation
+TIMESTAMP_CACHE_TOLERANCE = timedelta(milliseconds=1)
+
 
 class TestErrorDetail:
     """Test cases for ErrorDetail model."""
@@ -97,7 +100,7 @@ class TestErrorResponse:
         
         after_create = datetime.utcnow()
         
-        assert before_create <= error_response.timestamp <= after_create
+        assert before_create - TIMESTAMP_CACHE_TOLERANCE <= error_response.timestamp <= after_create
 
 
 class TestSuccessResponse:
@@ -139,7 +142,7 @@ class TestSuccessResponse:
         
         after_create = datetime.utcnow()
         
-        assert before_create <= success_response.timestamp <= after_create
+        assert before_create - TIMESTAMP_CACHE_TOLERANCE <= success_response.timestamp <= after_create
 
 
 class TestHealthCheckResponse:
@@ -188,7 +191,7 @@ class TestHealthCheckResponse:
         
         after_create = datetime.utcnow()
         
-        assert before_create <= health_response.timestamp <= after_create
+        assert before_create - TIMESTAMP_CACHE_TOLERANCE <= health_response.timestamp <= after_create
 
 
 class TestPaginationParams:
@@ -248,7 +248,7 @@ class TestTripDataRequest:
                 preferences=["A" * 51],
                 **base_data
             )
-        assert "less than 50 characters" in str(exc_info.value)
+        assert "at most 50 characters" in str(exc_info.value)
         
         # Test non-string preference
         with pytest.raises(ValidationError) as exc_info:
@@ -0,0 +1,142 @@
+"""
+Unit tests for the in-memory rate limiter.
+
+Tests cover token bucket accounting, limit enforcement, header values,
+and expiry and eviction of client entries.
+"""
+
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.rate_limiter import RateLimiter, RateLimitMiddleware
+
+
+class TestRateLimiter:
+    """Test cases for RateLimiter class."""
+
+    @pytest.fixture
+    def limiter(self):
+        """Create a RateLimiter allowing three requests per minute."""
+        return RateLimiter(requests_per_window=3, window_seconds=60)
+
+    def test_requests_within_limit_are_allowed(self, limiter):
+        """Test that requests up to the limit are allowed with decreasing remaining count."""
+        remaining = []
+        for _ in range(3):
+            allowed, headers = limiter.is_allowed("client-a")
+            assert allowed is True
+            remaining.append(dict(headers)[b"x-ratelimit-remaining"])
+
+        assert remaining == [b"2", b"1", b"0"]
+        assert dict(headers)[b"x-ratelimit-limit"] == b"3"
+
+    def test_request_over_limit_is_rejected(self, limiter):
+        """Test that the request after the limit is rejected without affecting other clients."""
+        for _ in range(3):
+            limiter.is_allowed("client-a")
+
+        allowed, headers = limiter.is_allowed("client-a")
+        assert allowed is False
+        assert dict(headers)[b"x-ratelimit-remaining"] == b"0"
+
+        allowed, _ = limiter.is_allowed("client-b")
+        assert allowed is True
+
+    def test_clients_expire_after_one_window(self, limiter):
+        """Test that client entries expire once their bucket would be full again."""
+        limiter.is_allowed("client-a")
+
+        limiter.clients.expire(time.monotonic() + limiter.window_seconds - 1)
+        assert "client-a" in limiter.clients
+
+        limiter.clients.expire(time.monotonic() + limiter.window_seconds)
+        assert "client-a" not in limiter.clients
+
+    def test_tokens_refill_over_time(self, limiter):
+        """Test that the bucket refills at limit / window tokens per second."""
+        start = 1000.0
+
+        # Drain the bucket
+        results = [limiter._decide("client-a", start)[0] for _ in range(4)]
+        assert results == [True, True, True, False]
+
+        # One token comes back after a third of the window
+        refilled = start + limiter.window_seconds / 3
+        results = [limiter._decide("client-a", refilled)[0] for _ in range(2)]
+        assert results == [True, False]
+
+        # The bucket never holds more than the limit
+        allowed, tokens = limiter._decide("client-a", start + 10 * limiter.window_seconds)
+        assert allowed is True
+        assert tokens == 2
+
+    def test_least_recently_used_client_is_evicted_when_full(self, monkeypatch):
+        """Test that the least recently used client is evicted past MAX_CLIENTS."""
+        monkeypatch.setattr(RateLimiter, "MAX_CLIENTS", 2)
+        limiter = RateLimiter(requests_per_window=3, window_seconds=60)
+        limiter.is_allowed("client-a")
+        limiter.is_allowed("client-b")
+        limiter.is_allowed("client-a")
+        limiter.is_allowed("client-c")
+
+        assert set(limiter.clients) == {"client-a", "client-c"}
+
+    def test_reset_header_is_epoch_based(self, limiter):
+        """Test that the reset header is when the bucket is full again, in epoch seconds."""
+        _, headers = limiter.is_allowed("client-a")
+
+        # One token was used, so the bucket is full again a third of the window later
+        reset = int(dict(headers)[b"x-ratelimit-reset"])
+        assert time.time() + 18 <= reset <= time.time() + 22
+
+    def test_rejection_includes_retry_after(self, limiter):
+        """Test that rejected requests report when the next token is available."""
+        for _ in range(3):
+            _, headers = limiter.is_allowed("client-a")
+            assert b"retry-after" not in dict(headers)
+
+        allowed, headers = limiter.is_allowed("client-a")
+        assert allowed is False
+        assert dict(headers)[b"retry-after"] == b"20"
+
+
+class TestRateLimitMiddleware:
+    """Test cases for RateLimitMiddleware."""
+
+    @pytest.fixture
+    def client(self):
+        """Create a client for an app limited to one request per minute."""
+        app = FastAPI()
+        app.add_middleware(RateLimitMiddleware, limiter=RateLimiter(requests_per_window=1, window_seconds=60))
+
+        @app.get("/limited")
+        async def limited():
+            return {"ok": True}
+
+        @app.get("/health")
+        async def health():
+            return {"status": "healthy"}
+
+        return TestClient(app)
+
+    def test_rate_limit_headers_and_rejection(self, client):
+        """Test that headers are added and requests over the limit get a 429."""
+        response = client.get("/limited")
+        assert response.status_code == 200
+        assert response.headers["X-RateLimit-Remaining"] == "0"
+
+        response = client.get("/limited")
+        assert response.status_code == 429
+        assert response.json()["error"] == "RATE_LIMIT_EXCEEDED"
+        assert response.headers["X-RateLimit-Limit"] == "1"
+        assert response.headers["Retry-After"] == "60"
+
+    def test_skip_paths_are_not_limited(self, client):
+        """Test that allowlisted paths bypass the limiter."""
+        for _ in range(3):
+            response = client.get("/health")
+            assert response.status_code == 200
+            assert "X-RateLimit-Limit" not in response.headers